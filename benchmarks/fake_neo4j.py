@@ -0,0 +1,315 @@
+"""
+An in-process stand-in for the `neo4j.GraphDatabase` driver, its sessions and transactions.
+Statements are not executed but counted; results are produced by the driver's `responder`,
+which gets the query text and parameters of every statement.
+Errors put in the driver's `faults` are raised by the next statements, one per statement,
+e.g. `neo4j.exceptions.TransientError` to simulate a leader switch.
+The driver records every transaction begin, statement, commit and rollback in order in its `log`
+and the most transactions open at the same time in `peak_in_flight`, to check ordering and concurrency.
+
+```
+model = DataModel("bolt://fake", ("neo4j", "neo4j"), driver_factory=FakeDriver)
+async_model = AsyncDataModel(model, driver_factory=FakeAsyncDriver)
+```
+"""
+
+from __future__ import annotations
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+class FakeNode:
+    """
+    Duck-typed `neo4j.graph.Node`
+    """
+
+    def __init__(self, element_id: str, labels: Iterable[str], properties: dict):
+        self.element_id = element_id
+        self.labels: FrozenSet[str] = frozenset(labels)
+        self._properties = properties
+
+
+class FakeRelationship:
+    """
+    Duck-typed `neo4j.graph.Relationship`
+    """
+
+    def __init__(
+        self,
+        element_id: str,
+        type: str,
+        start_node: FakeNode,
+        end_node: FakeNode,
+        properties: dict,
+    ):
+        self.element_id = element_id
+        self.type = type
+        self.start_node = start_node
+        self.end_node = end_node
+        self._properties = properties
+
+
+class FakeGraph:
+    """
+    Duck-typed `neo4j.graph.Graph`
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[FakeNode] = (),
+        relationships: Iterable[FakeRelationship] = (),
+    ):
+        self.nodes = list(nodes)
+        self.relationships = list(relationships)
+
+
+class FakeSummary:
+    def __init__(self, query: str, parameters: dict):
+        self.query = query
+        self.parameters = parameters
+
+
+class FakeResult:
+    def __init__(self, records: Iterable[dict] = (), graph: Optional[FakeGraph] = None):
+        self._records = iter(records)
+        self._graph = graph if graph is not None else FakeGraph()
+        self.summary: Optional[FakeSummary] = None
+
+    def __iter__(self):
+        return self._records
+
+    def fetch(self, n: int) -> List[dict]:
+        return [record for _, record in zip(range(n), self._records)]
+
+    def consume(self) -> Optional[FakeSummary]:
+        for _ in self._records:
+            pass
+        return self.summary
+
+    def graph(self) -> FakeGraph:
+        return self._graph
+
+
+Responder = Callable[[str, dict], FakeResult]
+# (event, transaction id, query): event is "begin", "run", "commit" or "rollback", the query only set for "run"
+LogEntry = Tuple[str, int, Optional[str]]
+
+_opened_lock = threading.Lock()
+
+
+class FakeTransaction:
+    def __init__(self, driver: FakeDriver):
+        self.driver = driver
+        self.id = driver._next_id()
+
+    def run(self, query: str, parameters: Optional[dict] = None, **kwargs):
+        parameters = {**(parameters or {}), **kwargs}
+        self.driver._log("run", self.id, query)
+        fault = self.driver._next_fault()
+        if fault is not None:
+            raise fault
+        self.driver._count("statements")
+        self.driver._count("rows", len(parameters.get("rows", ())) or 1)
+        result = self.driver.responder(query, parameters)
+        result.summary = FakeSummary(query, parameters)
+        return result
+
+    def commit(self):
+        self.driver._count("commits")
+        self.driver._log("commit", self.id)
+
+    def rollback(self):
+        self.driver._count("rollbacks")
+        self.driver._log("rollback", self.id)
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> FakeTransaction:
+        self.driver._count("transactions")
+        self.driver._enter(self.id)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.driver._exit()
+
+
+class FakeSession:
+    def __init__(self, driver: FakeDriver, **config):
+        self.driver = driver
+        self.config = config
+        driver._count("sessions")
+
+    def begin_transaction(self) -> FakeTransaction:
+        return FakeTransaction(self.driver)
+
+    def run(self, query: str, parameters: Optional[dict] = None, **kwargs):
+        return FakeTransaction(self.driver).run(query, parameters, **kwargs)
+
+    def execute_write(self, work: Callable, *args, **kwargs):
+        with FakeTransaction(self.driver) as tx:
+            return work(tx, *args, **kwargs)
+
+    execute_read = execute_write
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> FakeSession:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class FakeDriver:
+    """
+    Counts connections (drivers) opened, sessions, transactions, statements and rows in `counters`.
+    """
+
+    connections_opened = 0
+
+    def __init__(self, uri: str, auth=None, **config):
+        self.uri = uri
+        self.config = config
+        self.responder: Responder = lambda query, parameters: FakeResult()
+        self.faults: List[BaseException] = []
+        self.counters: Dict[str, int] = {}
+        self.log: List[LogEntry] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.closed = False
+        self._ids = 0
+        self._lock = threading.Lock()
+        with _opened_lock:
+            FakeDriver.connections_opened += 1
+
+    def verify_connectivity(self):
+        self._count("round_trips")
+
+    def session(self, **config) -> FakeSession:
+        return FakeSession(self, **config)
+
+    def close(self):
+        self.closed = True
+
+    def _next_fault(self) -> Optional[BaseException]:
+        with self._lock:
+            if self.faults:
+                self.counters["faults"] = self.counters.get("faults", 0) + 1
+                return self.faults.pop(0)
+        return None
+
+    def _next_id(self) -> int:
+        with self._lock:
+            self._ids += 1
+            return self._ids
+
+    def _enter(self, transaction: int):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.log.append(("begin", transaction, None))
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _log(self, event: str, transaction: int, query: Optional[str] = None):
+        with self._lock:
+            self.log.append((event, transaction, query))
+
+    def _count(self, counter: str, n: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+
+class FakeAsyncResult:
+    def __init__(self, result: FakeResult):
+        self._result = result
+        self.summary = result.summary
+
+    def __aiter__(self) -> FakeAsyncResult:
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            return next(self._result._records)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+    async def fetch(self, n: int) -> List[dict]:
+        return self._result.fetch(n)
+
+    async def consume(self) -> Optional[FakeSummary]:
+        return self._result.consume()
+
+    async def graph(self) -> FakeGraph:
+        return self._result.graph()
+
+
+class FakeAsyncTransaction:
+    def __init__(self, driver: FakeDriver):
+        self._tx = FakeTransaction(driver)
+
+    async def run(self, query: str, parameters: Optional[dict] = None, **kwargs):
+        return FakeAsyncResult(self._tx.run(query, parameters, **kwargs))
+
+    async def commit(self):
+        self._tx.commit()
+
+    async def rollback(self):
+        self._tx.rollback()
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self) -> FakeAsyncTransaction:
+        self._tx.__enter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._tx.__exit__(exc_type, exc_value, traceback)
+
+
+class FakeAsyncSession:
+    def __init__(self, driver: FakeDriver, **config):
+        self.driver = driver
+        self.config = config
+        driver._count("sessions")
+
+    async def begin_transaction(self) -> FakeAsyncTransaction:
+        return FakeAsyncTransaction(self.driver)
+
+    async def run(self, query: str, parameters: Optional[dict] = None, **kwargs):
+        return await FakeAsyncTransaction(self.driver).run(query, parameters, **kwargs)
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self) -> FakeAsyncSession:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+class FakeAsyncDriver(FakeDriver):
+    """
+    Duck-typed `neo4j.AsyncDriver`, counting and logging like `FakeDriver`
+    """
+
+    async def verify_connectivity(self):
+        self._count("round_trips")
+
+    def session(self, **config) -> FakeAsyncSession:
+        return FakeAsyncSession(self, **config)
+
+    async def close(self):
+        self.closed = True
@@ -0,0 +1,288 @@
+"""
+Benchmarks of ogr's hot paths, run offline against `benchmarks.fake_neo4j`.
+
+```
+python -m benchmarks                                  # run with the default sizes
+python -m benchmarks --sizes 1000,100000,1000000      # include the 1M ops runs
+python -m benchmarks --save benchmarks/baseline.json  # record a baseline
+python -m benchmarks --compare benchmarks/baseline.json --tolerance 0.2
+```
+
+Every benchmark reports ops/sec (best of `--repeat` runs) and the peak memory allocated per op
+(traced with `tracemalloc` in a separate run, as tracing slows down the timed runs).
+With `--compare`, the exit code is 1 if any benchmark is slower than the baseline by more than `tolerance`.
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.fake_neo4j import (
+    FakeDriver,
+    FakeGraph,
+    FakeNode,
+    FakeRelationship,
+    FakeResult,
+)
+from ogr.graph import Graph
+from ogr.model import DataModel
+
+N_CLASSES = 200
+
+# a benchmark takes the number of ops, does its setup and returns the measured function
+Benchmark = Callable[[int], Callable[[], None]]
+
+
+def _model(n_classes: int = 1) -> Tuple[DataModel, List[type], type]:
+    model = DataModel("bolt://fake", ("neo4j", "neo4j"), driver_factory=FakeDriver)
+    classes = [
+        model.register_node(
+            type(f"BenchNode{i}", (), {"__annotations__": {"value": int, "name": str}})
+        )
+        for i in range(n_classes)
+    ]
+    connection = model.register_connection(
+        type("BenchConnection", (), {"__annotations__": {"weight": float}})
+    )
+    model.open()
+    return model, classes, connection
+
+
+def _graph_with_changes(n: int) -> Tuple[DataModel, Graph]:
+    """
+    a graph with n pending changes: n/2 created nodes connected by n/2 created connections
+    """
+    model, (node_cls,), connection_cls = _model()
+    graph = Graph(model)
+    nodes = [node_cls(value=i, name=str(i)) for i in range(max(n // 2, 1))]
+    for node in nodes:
+        graph.create_node(node)
+    for i in range(n - len(nodes)):
+        graph.create_connection(
+            connection_cls(
+                node_a=nodes[i % len(nodes)],
+                node_b=nodes[(i + 1) % len(nodes)],
+                weight=1.0,
+            )
+        )
+    return model, graph
+
+
+def bench_create_node(n: int) -> Callable[[], None]:
+    model, (node_cls,), _ = _model()
+    graph = Graph(model)
+    nodes = [node_cls(value=i, name=str(i)) for i in range(n)]
+
+    def run():
+        for node in nodes:
+            graph.create_node(node)
+
+    return run
+
+
+def bench_create_connection(n: int) -> Callable[[], None]:
+    model, (node_cls,), connection_cls = _model()
+    graph = Graph(model)
+    nodes = [node_cls(value=i, name=str(i)) for i in range(n + 1)]
+    for node in nodes:
+        graph.create_node(node)
+    connections = [
+        connection_cls(node_a=nodes[i], node_b=nodes[i + 1], weight=1.0)
+        for i in range(n)
+    ]
+
+    def run():
+        for connection in connections:
+            graph.create_connection(connection)
+
+    return run
+
+
+def bench_write_graph(n: int) -> Callable[[], None]:
+    model, graph = _graph_with_changes(n)
+    return lambda: model.write_graph(graph)
+
+
+def bench_write_graph_batched(n: int) -> Callable[[], None]:
+    model, graph = _graph_with_changes(n)
+    return lambda: model.write_graph(graph, batch_size=1000)
+
+
+def _raw_nodes(n: int, classes: List[type]) -> List[FakeNode]:
+    return [
+        FakeNode(
+            f"4:bench:{i}",
+            [*classes[i % len(classes)].labels, "Dynamic"],
+            {"uuid": f"uuid-{i}", "value": i, "name": str(i)},
+        )
+        for i in range(n)
+    ]
+
+
+def bench_resolve_node(n: int) -> Callable[[], None]:
+    model, classes, _ = _model(N_CLASSES)
+    raw_nodes = _raw_nodes(n, classes)
+
+    def run():
+        for raw_node in raw_nodes:
+            model.resolve_node(raw_node, {})
+
+    return run
+
+
+def bench_infer_node_type(n: int) -> Callable[[], None]:
+    model, classes, _ = _model(N_CLASSES)
+    label_sets = [frozenset(x.labels) for x in _raw_nodes(n, classes)]
+
+    def run():
+        for labels in label_sets:
+            model._infer_node_type(labels)
+
+    return run
+
+
+def bench_read_subgraph(n: int) -> Callable[[], None]:
+    """
+    materialisation of a star shaped subgraph with n entities
+    """
+    model, (node_cls,), connection_cls = _model()
+    raw_nodes = _raw_nodes(max(n // 2, 1), [node_cls])
+    raw_relationships = [
+        FakeRelationship(
+            f"5:bench:{i}",
+            connection_cls.type,
+            raw_nodes[0],
+            raw_nodes[i % len(raw_nodes)],
+            {"uuid": f"conn-{i}", "weight": 1.0},
+        )
+        for i in range(n - len(raw_nodes))
+    ]
+    raw_graph = FakeGraph(raw_nodes, raw_relationships)
+    model.driver.responder = lambda query, parameters: FakeResult(graph=raw_graph)
+    base_node = node_cls(uuid="uuid-0", value=0, name="0")
+    return lambda: model.read_subgraph(
+        base_node, with_conns={connection_cls}, max_depth=2
+    )
+
+
+def _bench_load_graph(n: int, compact: bool) -> Callable[[], None]:
+    """
+    loading n raw nodes into a `Graph`, as node objects or into compact node tables
+    """
+    model, (node_cls,), _ = _model()
+    raw_graph = FakeGraph(_raw_nodes(n, [node_cls]))
+    return lambda: Graph(model, raw_graph=raw_graph, compact=compact)
+
+
+def bench_load_graph(n: int) -> Callable[[], None]:
+    return _bench_load_graph(n, compact=False)
+
+
+def bench_load_graph_compact(n: int) -> Callable[[], None]:
+    return _bench_load_graph(n, compact=True)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "graph.create_node": bench_create_node,
+    "graph.create_connection": bench_create_connection,
+    "model.write_graph": bench_write_graph,
+    "model.write_graph(batch_size=1000)": bench_write_graph_batched,
+    "model.resolve_node": bench_resolve_node,
+    "model._infer_node_type": bench_infer_node_type,
+    "model.read_subgraph": bench_read_subgraph,
+    "Graph(raw_graph)": bench_load_graph,
+    "Graph(raw_graph, compact=True)": bench_load_graph_compact,
+}
+
+
+def measure(benchmark: Benchmark, n: int, repeat: int, trace: bool) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        run = benchmark(n)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    result = {"ops": n, "seconds": best, "ops_per_sec": n / best if best else 0.0}
+    if trace:
+        run = benchmark(n)
+        gc.collect()
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_bytes_per_op"] = peak / n
+    return result
+
+
+def run_suite(
+    sizes: List[int], repeat: int = 3, trace: bool = True, only: str = ""
+) -> Dict[str, dict]:
+    results = {}
+    for name, benchmark in BENCHMARKS.items():
+        if only and only not in name:
+            continue
+        for n in sizes:
+            key = f"{name}[{n}]"
+            results[key] = measure(benchmark, n, repeat, trace)
+            _print(key, results[key])
+    return results
+
+
+def compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """
+    returns the benchmarks that are slower than their baseline by more than `tolerance`
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        ratio = result["ops_per_sec"] / reference["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{key}: {ratio:.2f}x of baseline")
+    return regressions
+
+
+def _print(key: str, result: dict):
+    line = f"{key:<50} {result['ops_per_sec']:>14,.0f} ops/s"
+    if "peak_bytes_per_op" in result:
+        line += f" {result['peak_bytes_per_op']:>10,.1f} B/op peak"
+    print(line, flush=True)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--sizes", default="1000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-trace", action="store_true")
+    parser.add_argument("--only", default="", help="run benchmarks containing this")
+    parser.add_argument("--save", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(",")]
+    results = run_suite(sizes, args.repeat, not args.no_trace, args.only)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
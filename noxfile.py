@@ -23,3 +23,9 @@ def make_docs(session):
         "--mermaid",
         "ogr",
     )
+
+
+@nox.session(python=False)
+def benchmark(session):
+    session.run("poetry", "install", "--with", "dev")
+    session.run("poetry", "run", "python", "-m", "benchmarks", *session.posargs)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+import neo4j as n4
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, Optional, Set
+from ogr.batch import plan_batches
+from ogr.connection import Connection, MetaConnection
+from ogr.graph import Graph
+from ogr.model import DataModel, _chunks, _lookup, _subgraph_query, _unique
+from ogr.node import MetaNode, Node
+from ogr.result import AsyncResult, Lookup
+
+
+class AsyncDataModel:
+    """
+    The asyncio counterpart of `DataModel`, built on `neo4j.AsyncGraphDatabase`.
+    Classes are registered with and resolved by the wrapped `model`, so one model definition
+    serves both sync and async callers:
+
+    ```
+    data_model = DataModel(uri, auth)
+    async_model = AsyncDataModel(data_model)
+    node_a, node_b = await asyncio.gather(
+        async_model.get_node_by_uuid(uuid_a),
+        async_model.get_node_by_uuid(uuid_b),
+    )
+    ```
+
+    Every call runs in a pooled session of its own, so independent calls can run concurrently.
+    """
+
+    def __init__(
+        self,
+        model: DataModel,
+        driver_factory: Callable[..., n4.AsyncDriver] = n4.AsyncGraphDatabase.driver,
+    ):
+        self.model = model
+        self.driver_factory = driver_factory
+        self.driver: Optional[n4.AsyncDriver] = None
+        self._driver_lock = asyncio.Lock()
+        # session and identity map bound by `session` in the current task
+        self._bound: contextvars.ContextVar = contextvars.ContextVar(
+            f"ogr_async_session_{id(self)}", default=None
+        )
+
+    async def open(self) -> AsyncDataModel:
+        """
+        opens the long-lived async driver, configured with the pool settings of `model`.
+        Calling `open` on an already opened model is a no-op.
+        """
+        async with self._driver_lock:
+            if self.driver is None:
+                driver = self.driver_factory(
+                    self.model.uri, auth=self.model.auth, **self.model.pool_config
+                )
+                await driver.verify_connectivity()
+                self.driver = driver
+        return self
+
+    async def close(self):
+        """
+        closes the async driver and all pooled connections
+        """
+        async with self._driver_lock:
+            if self.driver is not None:
+                await self.driver.close()
+                self.driver = None
+
+    async def __aenter__(self) -> AsyncDataModel:
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @asynccontextmanager
+    async def session(self, **config) -> AsyncIterator[n4.AsyncSession]:
+        """
+        yields a session from the pool; the driver is opened on first use.
+        While the session is open, all calls of this model in the current task reuse it
+        (and share its identity map). Calls sharing a session must not run concurrently.
+        """
+        bound = self._bound.get()
+        if bound is not None:
+            yield bound[0]
+            return
+        if self.driver is None:
+            await self.open()
+        async with self.driver.session(
+            database=self.model.data_base_name, **config
+        ) as session:
+            token = self._bound.set((session, {}))
+            try:
+                yield session
+            finally:
+                self._bound.reset(token)
+
+    async def write_graph(self, graph: Graph, batch_size: Optional[int] = None):
+        """
+        write changes performed on the `graph` to the database, see `DataModel.write_graph`
+        """
+        with self.model._flushing(graph, "async_write_graph"):
+            async with self.session() as session:
+                async with await session.begin_transaction() as tx:
+                    tx = self._instrument(tx, "async_write_graph")
+                    if batch_size is not None:
+                        for batch in plan_batches(graph.changes, batch_size):
+                            results = await tx.run(batch.query, rows=batch.rows)
+                            await results.consume()
+                    else:
+                        for change in graph.changes:
+                            if change.is_noop:
+                                continue
+                            results = await tx.run(*change.statement())
+                            await results.consume()
+
+    async def get_node_by_uuid(self, uuid: str, cls: Optional[MetaNode] = None):
+        """
+        queries database for the node by uuid, see `DataModel.get_node_by_uuid`
+        """
+        node = self.model._cached_node(uuid, cls, self._identity_map())
+        if node is not None:
+            return node
+        async with self.session() as session:
+            async with await session.begin_transaction() as tx:
+                tx = self._instrument(tx, "async_get_node_by_uuid")
+                results: n4.AsyncResult = await tx.run(
+                    self.model._node_query(cls), uuid=uuid
+                )
+                records = await results.fetch(1)
+                await results.consume()
+                if not records:
+                    return None
+                return self.model.resolve_node(records[0]["a"], self._identity_map())
+
+    async def get_connection_by_uuid(
+        self, uuid: str, cls: Optional[MetaConnection] = None
+    ):
+        """
+        queries database for the connection by uuid, see `DataModel.get_connection_by_uuid`
+        """
+        async with self.session() as session:
+            async with await session.begin_transaction() as tx:
+                tx = self._instrument(tx, "async_get_connection_by_uuid")
+                results: n4.AsyncResult = await tx.run(
+                    self.model._connection_query(cls), uuid=uuid
+                )
+                records = await results.fetch(1)
+                await results.consume()
+                if not records:
+                    return None
+                return self.model.resolve_connection(
+                    records[0]["c"], self._identity_map()
+                )
+
+    async def get_nodes_by_uuids(
+        self,
+        uuids: Iterable[str],
+        cls: Optional[MetaNode] = None,
+        chunk_size: int = 1000,
+        use_cache: bool = True,
+    ) -> Lookup:
+        """
+        queries database for all nodes in `uuids`, see `DataModel.get_nodes_by_uuids`
+        """
+        uuids = _unique(uuids)
+        found, pending = self.model._cached_nodes(
+            uuids, use_cache, cls, self._identity_map()
+        )
+        if pending:
+            query = self.model._node_query(cls, unwind=True)
+            async with self.session() as session:
+                async with await session.begin_transaction() as tx:
+                    tx = self._instrument(tx, "async_get_nodes_by_uuids")
+                    for chunk in _chunks(pending, chunk_size):
+                        results: n4.AsyncResult = await tx.run(query, uuids=chunk)
+                        async for record in results:
+                            node = self.model.resolve_node(
+                                record["a"], self._identity_map()
+                            )
+                            found[node.uuid] = node
+        return _lookup(uuids, found)
+
+    async def get_connections_by_uuids(
+        self,
+        uuids: Iterable[str],
+        cls: Optional[MetaConnection] = None,
+        chunk_size: int = 1000,
+    ) -> Lookup:
+        """
+        queries database for all connections in `uuids`, see `DataModel.get_connections_by_uuids`
+        """
+        uuids = _unique(uuids)
+        found = {}
+        if uuids:
+            query = self.model._connection_query(cls, unwind=True)
+            async with self.session() as session:
+                async with await session.begin_transaction() as tx:
+                    tx = self._instrument(tx, "async_get_connections_by_uuids")
+                    for chunk in _chunks(uuids, chunk_size):
+                        results: n4.AsyncResult = await tx.run(query, uuids=chunk)
+                        async for record in results:
+                            connection = self.model.resolve_connection(
+                                record["c"], self._identity_map()
+                            )
+                            found[connection.uuid] = connection
+        return _lookup(uuids, found)
+
+    async def read(self, query: str, **kwargs) -> Graph:
+        """
+        query the db and resolve objects
+        """
+        async with self.session() as session:
+            async with await session.begin_transaction() as tx:
+                tx = self._instrument(tx, "async_read")
+                results: n4.AsyncResult = await tx.run(query, **kwargs)
+                return Graph(self.model, raw_graph=await results.graph())
+
+    async def read_subgraph(
+        self, base_node: Node, with_conns: Set[Connection] = None, max_depth=1
+    ) -> Graph:
+        """
+        Returns the subgraph around `base_node`, see `DataModel.read_subgraph`
+        """
+        async with self.session() as session:
+            async with await session.begin_transaction() as tx:
+                tx = self._instrument(tx, "async_read_subgraph")
+                results: n4.AsyncResult = await tx.run(
+                    _subgraph_query(type(base_node).labels, with_conns, max_depth),
+                    uuid=base_node.uuid,
+                )
+                return Graph(self.model, raw_graph=await results.graph())
+
+    async def query(
+        self, query: str, *args, fetch_size: int = 1000, **kwargs
+    ) -> AsyncResult:
+        """
+        runs `query` and returns an `AsyncResult` streaming its resolved records, see `DataModel.query`:
+
+        ```
+        async with await async_model.query("MATCH (n:ExampleNode) RETURN n") as result:
+            async for record in result:
+                ...
+        ```
+        """
+        bound = self._bound.get()
+        if bound is not None:
+            bound = self._instrument(bound[0], "async_query")
+            return AsyncResult(self.model, await bound.run(query, *args, **kwargs))
+        if self.driver is None:
+            await self.open()
+        session = self.driver.session(
+            database=self.model.data_base_name, fetch_size=fetch_size
+        )
+        try:
+            n4_result = await self._instrument(session, "async_query").run(
+                query, *args, **kwargs
+            )
+        except BaseException:
+            await session.close()
+            raise
+        return AsyncResult(self.model, n4_result, on_close=session.close)
+
+    def _instrument(self, tx, operation: str):
+        """
+        wraps `tx` (an async transaction or session) so its statements emit `StatementEvent`s
+        if the model is instrumented, see `DataModel._instrument`
+        """
+        if self.model.instrumentation is None:
+            return tx
+        return self.model.instrumentation.async_transaction(tx, operation)
+
+    def _identity_map(self) -> dict:
+        bound = self._bound.get()
+        return bound[1] if bound is not None else {}
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import attrs
+from typing import Dict, Iterable, List, Tuple
+from ogr.changes import Change
+from ogr.template import template_of
+
+
+@attrs.define
+class Batch:
+    """
+    A single parameterised `UNWIND $rows AS row ...` statement together with its rows
+    and the uuids of the changes they write.
+    """
+
+    kind: str
+    query: str
+    rows: List[dict]
+    uuids: List[str]
+
+    def run(self, tx):
+        tx.run(self.query, rows=self.rows).consume()
+
+
+# phases in the order they are flushed: nodes exist before the connections referencing them
+# are created, and deletes come last
+PHASES: Tuple[str, ...] = (
+    "create_node",
+    "set_node",
+    "create_connection",
+    "set_connection",
+    "delete_connection",
+    "delete_node",
+)
+
+_UNWIND = {action: f"unwind_{action}" for action in ("create", "set", "delete")}
+
+
+def plan_batches(changes: Iterable[Change], batch_size: int = 1000) -> List[Batch]:
+    """
+    groups `changes` (as recorded in `Graph.changes`) by kind and by label set or connection type
+    and returns them as `UNWIND` batches of at most `batch_size` rows, ordered by `PHASES`
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    # templates hand out the same query text for all objects of a group, so it is used as group key
+    groups: Dict[str, Dict[str, Tuple[List[dict], List[str]]]] = {
+        phase: {} for phase in PHASES
+    }
+    for change in changes:
+        if change.is_noop:
+            continue
+        template = template_of(type(change.target))
+        query, row = getattr(template, _UNWIND[change.action])(change.target)
+        rows, uuids = groups[change.kind].setdefault(query, ([], []))
+        rows.append(row)
+        uuids.append(change.uuid)
+
+    batches = []
+    for phase in PHASES:
+        for query, (rows, uuids) in groups[phase].items():
+            for i in range(0, len(rows), batch_size):
+                batches.append(
+                    Batch(
+                        phase,
+                        query,
+                        rows[i : i + batch_size],
+                        uuids[i : i + batch_size],
+                    )
+                )
+    return batches
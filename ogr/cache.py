@@ -0,0 +1,292 @@
+from __future__ import annotations
+import attrs
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+from ogr.template import _freeze
+
+
+class ObjectCache:
+    """
+    A bounded least-recently-used cache of the labels and properties of resolved nodes keyed by uuid.
+    Entries are evicted once more than `max_size` nodes are cached or, if `ttl` is given,
+    once they are older than `ttl` seconds.
+    The cache holds frozen copies, not node objects: every hit is materialised into a fresh object
+    (see `DataModel.get_node_by_uuid`), so unwritten changes of one caller never leak to another.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[
+            str, Tuple[float, FrozenSet[str], Dict[str, Any]]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, uuid: str) -> bool:
+        return uuid in self._entries
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, uuid: str) -> Optional[Tuple[FrozenSet[str], Dict[str, Any]]]:
+        """
+        the labels and a fresh copy of the properties cached for `uuid`
+        """
+        with self._lock:
+            entry = self._entries.get(uuid)
+            if entry is not None and self.ttl is not None:
+                if self.clock() - entry[0] > self.ttl:
+                    del self._entries[uuid]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(uuid)
+            self.hits += 1
+        _, labels, properties = entry
+        return labels, {name: _thaw(value) for name, value in properties.items()}
+
+    def put(self, uuid: str, labels: Iterable[str], properties: Dict[str, Any]):
+        frozen = {name: _freeze(value) for name, value in properties.items()}
+        with self._lock:
+            self._entries[uuid] = (self.clock(), frozenset(labels), frozen)
+            self._entries.move_to_end(uuid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, uuids: Iterable[str]):
+        with self._lock:
+            for uuid in uuids:
+                self._entries.pop(uuid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class QueryCache:
+    """
+    A bounded least-recently-used cache of read results keyed by query text and parameters.
+    Entries are evicted once more than `max_size` results are cached or, if `ttl` is given,
+    once they are older than `ttl` seconds.
+
+    Every entry records what its result depends on: the uuids of the entities it contains and the labels
+    and connection types its query matches (`None` standing for any), so `invalidate` drops only
+    the entries a write may have changed.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1_000,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # bumped by every invalidation, so results read before it are not stored after it
+        self.generation = 0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._by_uuid: Dict[str, Set[Hashable]] = {}
+        self._by_label: Dict[str, Set[Hashable]] = {}
+        self._by_type: Dict[str, Set[Hashable]] = {}
+        self._any_label: Set[Hashable] = set()
+        self._any_type: Set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(query: str, params: dict) -> Hashable:
+        return query, json.dumps(params, sort_keys=True, default=repr)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None:
+                if self.clock() - entry.time > self.ttl:
+                    self._remove(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(
+        self,
+        key: Hashable,
+        value: object,
+        uuids: Iterable[str] = (),
+        labels: Optional[Iterable[str]] = (),
+        types: Optional[Iterable[str]] = (),
+        generation: Optional[int] = None,
+    ):
+        """
+        caches `value` (which must not be `None`) with its dependencies.
+        If `generation` is given and the cache was invalidated since, the value may be stale and is not cached.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            entry = _Entry(
+                self.clock(),
+                value,
+                frozenset(uuids),
+                None if labels is None else frozenset(labels),
+                None if types is None else frozenset(types),
+            )
+            self._entries[key] = entry
+            _link(self._by_uuid, entry.uuids, key)
+            if entry.labels is None:
+                self._any_label.add(key)
+            else:
+                _link(self._by_label, entry.labels, key)
+            if entry.types is None:
+                self._any_type.add(key)
+            else:
+                _link(self._by_type, entry.types, key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(
+        self,
+        uuids: Iterable[str] = (),
+        labels: Iterable[str] = (),
+        types: Iterable[str] = (),
+    ):
+        """
+        drops the entries containing any of `uuids` or matching any of `labels` or `types`
+        """
+        uuids, labels, types = set(uuids), set(labels), set(types)
+        with self._lock:
+            self.generation += 1
+            keys = set()
+            for index, names in (
+                (self._by_uuid, uuids),
+                (self._by_label, labels),
+                (self._by_type, types),
+            ):
+                for name in names:
+                    keys.update(index.get(name, ()))
+            if labels:
+                keys.update(self._any_label)
+            if types:
+                keys.update(self._any_type)
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            for index in (self._by_uuid, self._by_label, self._by_type):
+                index.clear()
+            self._any_label.clear()
+            self._any_type.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        _unlink(self._by_uuid, entry.uuids, key)
+        if entry.labels is None:
+            self._any_label.discard(key)
+        else:
+            _unlink(self._by_label, entry.labels, key)
+        if entry.types is None:
+            self._any_type.discard(key)
+        else:
+            _unlink(self._by_type, entry.types, key)
+
+
+@attrs.define
+class _Entry:
+    time: float
+    value: object
+    uuids: FrozenSet[str]
+    labels: Optional[FrozenSet[str]]
+    types: Optional[FrozenSet[str]]
+
+
+def _link(index: Dict[str, Set[Hashable]], names: Iterable[str], key: Hashable):
+    for name in names:
+        index.setdefault(name, set()).add(key)
+
+
+def _unlink(index: Dict[str, Set[Hashable]], names: Iterable[str], key: Hashable):
+    for name in names:
+        keys = index.get(name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[name]
+
+
+def _thaw(value: Any) -> Any:
+    """
+    a mutable copy of a value frozen by `_freeze`
+    """
+    if isinstance(value, tuple):
+        return [_thaw(x) for x in value]
+    return value
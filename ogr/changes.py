@@ -0,0 +1,138 @@
+from __future__ import annotations
+import attrs
+from typing import Dict, Iterable, Iterator, Optional, Set
+from ogr.node import Node
+from ogr.connection import Connection
+from ogr.template import Statement, template_of
+
+CREATE, SET, DELETE = "create", "set", "delete"
+
+
+@attrs.define
+class Change:
+    """
+    A pending change of a single node or connection.
+    The change references the object itself, so it is written with the object's state at flush time.
+    """
+
+    action: str
+    target: Node | Connection
+
+    @property
+    def uuid(self) -> str:
+        return self.target.uuid
+
+    @property
+    def entity(self) -> str:
+        return "node" if isinstance(self.target, Node) else "connection"
+
+    @property
+    def kind(self) -> str:
+        """
+        e.g. `"create_node"` or `"delete_connection"`
+        """
+        return f"{self.action}_{self.entity}"
+
+    @property
+    def is_noop(self) -> bool:
+        """
+        a set of an object whose properties and labels are unchanged since it was last read or written
+        """
+        return self.action == SET and not template_of(type(self.target)).dirty(
+            self.target
+        )
+
+    def persisted(self):
+        """
+        updates the target's snapshot once the change has been written
+        """
+        if self.action == DELETE:
+            self.target._persisted = None
+        else:
+            template_of(type(self.target)).snapshot(self.target)
+
+    def statement(self) -> Statement:
+        """
+        the statement writing this change, as compiled by the target's template
+        """
+        return getattr(template_of(type(self.target)), self.action)(self.target)
+
+
+class ChangeSet:
+    """
+    The pending changes of a `Graph`, keyed by uuid.
+    Changes of the same object are coalesced as they are recorded:
+    - create followed by any number of sets stays one create (written with the final state)
+    - create followed by delete cancels out
+    - repeated sets collapse into one set
+    - set followed by delete becomes a delete
+    Deleting a node also drops all pending changes of connections attached to it,
+    as `DETACH DELETE` removes them anyway.
+    """
+
+    def __init__(self):
+        self._changes: Dict[str, Change] = {}
+        self._connections_by_node: Dict[
+            str, Set[str]
+        ] = {}  # node uuid: connection uuids
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def __iter__(self) -> Iterator[Change]:
+        return iter(list(self._changes.values()))
+
+    def __contains__(self, uuid: str) -> bool:
+        return uuid in self._changes
+
+    def __repr__(self) -> str:
+        return f"ChangeSet({list(self._changes.values())!r})"
+
+    def get(self, uuid: str) -> Optional[Change]:
+        return self._changes.get(uuid)
+
+    def create(self, target: Node | Connection):
+        self._put(Change(CREATE, target))
+
+    def set(self, target: Node | Connection):
+        change = self._changes.get(target.uuid)
+        if change is None:
+            self._put(Change(SET, target))
+        elif change.action != DELETE:
+            change.target = target
+
+    def delete(self, target: Node | Connection):
+        if isinstance(target, Node):
+            for connection_uuid in self._connections_by_node.pop(target.uuid, ()):
+                self._pop(connection_uuid)
+        change = self._pop(target.uuid)
+        if change is None or change.action != CREATE:
+            self._put(Change(DELETE, target))
+
+    def discard(self, uuids: Iterable[str]):
+        """
+        forgets the pending changes of `uuids`, e.g. because they have been written
+        """
+        for uuid in uuids:
+            self._pop(uuid)
+
+    def clear(self):
+        self._changes.clear()
+        self._connections_by_node.clear()
+
+    def _put(self, change: Change):
+        self._changes[change.uuid] = change
+        if isinstance(change.target, Connection):
+            for node in (change.target.node_a, change.target.node_b):
+                self._connections_by_node.setdefault(node.uuid, set()).add(change.uuid)
+
+    def _pop(self, uuid: str) -> Optional[Change]:
+        change = self._changes.pop(uuid, None)
+        if change is not None and isinstance(change.target, Connection):
+            for node in (change.target.node_a, change.target.node_b):
+                connection_uuids = self._connections_by_node.get(node.uuid)
+                if connection_uuids is not None:
+                    connection_uuids.discard(uuid)
+                    if not connection_uuids:
+                        del self._connections_by_node[node.uuid]
+        return change
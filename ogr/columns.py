@@ -0,0 +1,167 @@
+"""
+Columnar export of graph nodes and connections as NumPy arrays, see `Graph.to_columns` and `Graph.edge_index`.
+NumPy is an optional dependency: it is only imported by these functions and has to be installed separately.
+"""
+
+from __future__ import annotations
+import attrs
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from ogr.index import connection_types
+from ogr.node import MetaNode
+from ogr.table import NodeView
+from ogr.template import template_of
+
+if TYPE_CHECKING:
+    import numpy as np
+    from ogr.connection import MetaConnection
+
+
+@attrs.define
+class Columns:
+    """
+    The nodes of one class as columns: the `uuids` and one array per property, all in row order,
+    and the row of every uuid in `index`. Properties are also available by name, e.g. `columns["age"]`.
+    Arrays of properties holding lists, dicts or `None`s have dtype `object`.
+    """
+
+    cls: MetaNode
+    uuids: np.ndarray
+    properties: Dict[str, np.ndarray]
+    index: Dict[str, int]  # uuid: row
+
+    def __len__(self) -> int:
+        return len(self.uuids)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.properties[name]
+
+
+def to_columns(graph, cls: MetaNode) -> Columns:
+    """
+    the nodes of class `cls` in `graph` (node objects first, then table rows of a compact graph) as `Columns`
+    """
+    np = _numpy()
+    template = template_of(cls)
+    objects = [node for node in graph.nodes.values() if type(node) is cls]
+    table = graph.tables.get(cls)
+    rows = [] if table is None else list(table.rows.values())
+    values = list(zip(*map(template._get, objects))) or [()] * len(
+        template.property_names
+    )
+    properties = {}
+    for name, object_values in zip(template.property_names, values):
+        if table is None:
+            properties[name] = _array(np, list(object_values))
+        elif (
+            not objects
+            and isinstance(table.columns[name], (list, memoryview))
+            and rows == list(range(len(table.uuids)))
+        ):
+            # all rows of the table in order: lists and mapped snapshot columns convert without a copy
+            properties[name] = _array(np, table.columns[name])
+        else:
+            column = table.columns[name]
+            properties[name] = _array(
+                np, [*object_values, *(column[row] for row in rows)]
+            )
+    uuids = [node.uuid for node in objects]
+    if table is not None:
+        uuids.extend(table.uuids[row] for row in rows)
+    return Columns(
+        cls,
+        np.asarray(uuids, dtype=str),
+        properties,
+        {uuid: row for row, uuid in enumerate(uuids)},
+    )
+
+
+def edge_index(
+    graph,
+    connection_type: MetaConnection | str,
+    source: Optional[MetaNode] = None,
+    target: Optional[MetaNode] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    the rows (as in `to_columns`) of the start nodes among the nodes of class `source`
+    and of the end nodes among the nodes of class `target` of all connections of `connection_type`,
+    as two int64 arrays, e.g. for `scipy.sparse.coo_matrix((weights, (rows, cols)))`.
+    `source` and `target` default to the class of the start / end nodes, which then must be the same for all
+    connections; connections whose ends are not nodes of `source` / `target` in the graph are left out.
+    """
+    np = _numpy()
+    (type_name,) = connection_types([connection_type])
+    connections = list(graph.index.by_type.get(type_name, {}).values())
+    if not connections:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    source = source or _single_class(x.node_a for x in connections)
+    target = target or _single_class(x.node_b for x in connections)
+    rows_a = node_rows(graph, source)
+    rows_b = rows_a if target is source else node_rows(graph, target)
+    starts, ends = [], []
+    for connection in connections:
+        start = rows_a.get(connection.node_a.uuid)
+        end = rows_b.get(connection.node_b.uuid)
+        if start is not None and end is not None:
+            starts.append(start)
+            ends.append(end)
+    return np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+
+
+def node_rows(graph, cls: MetaNode) -> Dict[str, int]:
+    """
+    the row of every node of class `cls` in `graph` by uuid, in the order of `to_columns`
+    """
+    uuids = [node.uuid for node in graph.nodes.values() if type(node) is cls]
+    table = graph.tables.get(cls)
+    if table is not None:
+        uuids.extend(table.rows)
+    return {uuid: row for row, uuid in enumerate(uuids)}
+
+
+def column_lists(columns: Dict[str, Sequence]) -> Tuple[Dict[str, List[Any]], int]:
+    """
+    converts columns (NumPy arrays, lists or other sequences) to lists of plain Python values
+    and returns them with their common length
+    """
+    lists = {
+        name: column.tolist() if hasattr(column, "tolist") else list(column)
+        for name, column in columns.items()
+    }
+    lengths = {len(x) for x in lists.values()}
+    if len(lengths) > 1:
+        raise ValueError(
+            f"columns differ in length: {', '.join(f'{name}: {len(x)}' for name, x in lists.items())}"
+        )
+    return lists, lengths.pop() if lengths else 0
+
+
+def _single_class(nodes) -> MetaNode:
+    classes = {node.cls if isinstance(node, NodeView) else type(node) for node in nodes}
+    if len(classes) > 1:
+        raise ValueError(
+            f"connections join nodes of several classes ({', '.join(sorted(x.__name__ for x in classes))}), "
+            "pass the class to index"
+        )
+    return classes.pop()
+
+
+def _array(np, values: Sequence) -> np.ndarray:
+    if isinstance(values, list) and any(
+        isinstance(x, (list, tuple, dict)) for x in values
+    ):
+        # one element per node, not nested arrays
+        array = np.empty(len(values), dtype=object)
+        for i, value in enumerate(values):
+            array[i] = value
+        return array
+    return np.asarray(values)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "columnar export requires numpy, which is not installed (pip install numpy)"
+        ) from None
+    return numpy
@@ -20,6 +20,10 @@ class Connection:
     uuid: str | None = attrs.field(default=None)
     node_a: Node
     node_b: Node
+    # state last written to or read from the database, see `ogr.template.ConnectionTemplate.snapshot`
+    _persisted: tuple | None = attrs.field(
+        default=None, init=False, eq=False, repr=False
+    )
 
     def create(self, graph: Graph):
         """
@@ -1,135 +1,356 @@
 from __future__ import annotations
-from ogr.node import Node
+from ogr.node import GenericNode, MetaNode, Node
 from ogr.connection import Connection
-from typing import List, Dict, Optional
+from ogr.changes import ChangeSet
+from ogr.template import template_of
+from ogr.index import BOTH, GraphIndex, connection_types
+from ogr.table import NodeTable, NodeView
+from ogr.snapshot import read_snapshot, write_snapshot
+from ogr.columns import Columns, edge_index, to_columns
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
 from functools import partial
 from uuid_extensions import uuid7str
 import neo4j.graph as n4_graph
 import neo4j as n4
-import attrs
+
+if TYPE_CHECKING:
+    from ogr.connection import MetaConnection
 
 
 class Graph:
     """
     This is an in memory graph.
+    Changes performed on it are recorded in `changes` until they are written by `DataModel.write_graph`.
+    Adjacency, connection type and label indexes are kept in `index`, so a loaded graph can be traversed
+    locally with `neighbors`, `edges_of`, `bfs` and `shortest_path`.
+
+    A `compact` graph keeps the nodes of a loaded `raw_graph` in per-class `NodeTable`s instead of
+    as node objects, which takes a fraction of the memory; they are handed out as read-only `NodeView`s
+    (see `node` and `nodes_with_label`, or follow connections) and materialised into node objects
+    when they are set or deleted. `nodes` holds only the node objects.
     """
 
-    # TODO think about optimizing change storage (performed_ops)
-    def __init__(self, model, raw_graph: Optional[n4_graph.Graph] = None):
+    def __init__(
+        self,
+        model,
+        raw_graph: Optional[n4_graph.Graph] = None,
+        compact: bool = False,
+    ):
         self.model = model
         self.nodes: Dict[str, Node] = {}  # node.uuid: node
         self.connections: Dict[str, Connection] = {}  # connection.uuid: connection
-        self.performed_ops: List[callable] = []
+        self.changes: ChangeSet = ChangeSet()
+        self.index: GraphIndex = GraphIndex()
+        self.tables: Dict[MetaNode, NodeTable] = {}
         if raw_graph is not None:
-            self.nodes = map(model.resolve_node, raw_graph.nodes)
-            self.connections = map(model.resolve_connection, raw_graph.relationships)
+            # graph-scoped identity map, so every entity is materialised exactly once
+            identity_map = {}
+            for raw_node in raw_graph.nodes:
+                if compact:
+                    self._add_row(raw_node, identity_map)
+                else:
+                    self.add_node(model.resolve_node(raw_node, identity_map))
+            for raw_connection in raw_graph.relationships:
+                self.add_connection(
+                    model.resolve_connection(raw_connection, identity_map)
+                )
+
+    @classmethod
+    def load(cls, model, path: str, compact: bool = True, mmap: bool = True) -> Graph:
+        """
+        loads a graph written by `save`; classes are resolved through the classes registered with `model`.
+        With `compact`, nodes are kept in node tables read lazily from the (memory mapped, with `mmap`) file.
+        The loaded nodes and connections count as persisted, so later changes are recorded as usual.
+        """
+        graph = cls(model)
+        read_snapshot(graph, path, compact=compact, use_mmap=mmap)
+        return graph
+
+    def save(self, path: str):
+        """
+        writes the nodes and connections of the graph to a binary snapshot at `path`, see `ogr.snapshot`.
+        The current state is written, the pending `changes` are not: a loaded snapshot counts as persisted.
+        """
+        write_snapshot(self, path)
+
+    def to_columns(self, cls: MetaNode) -> Columns:
+        """
+        the nodes of class `cls` as NumPy arrays per property plus their uuids and rows, see `ogr.columns`.
+        Requires numpy.
+        """
+        return to_columns(self, cls)
+
+    def edge_index(
+        self,
+        connection_type: MetaConnection | str,
+        source: Optional[MetaNode] = None,
+        target: Optional[MetaNode] = None,
+    ) -> tuple:
+        """
+        the start and end rows (as in `to_columns` of `source` and `target`) of the connections of
+        `connection_type` as int64 arrays, see `ogr.columns.edge_index`. Requires numpy.
+        """
+        return edge_index(self, connection_type, source, target)
+
+    @property
+    def performed_ops(self) -> List[callable]:
+        """
+        the pending changes as write operations taking a transaction, in the order they were recorded.
+        Sets of unchanged objects are left out.
+        """
+        return [
+            partial(_WRITE_OPS[change.kind], **{change.entity: change.target})
+            for change in self.changes
+            if not change.is_noop
+        ]
+
+    def add_node(self, node: Node):
+        """
+        adds an already persisted node to the graph without recording a change
+        """
+        for table in self.tables.values():
+            if node.uuid in table:
+                table.remove(node.uuid)
+        self.nodes[node.uuid] = node
+        self.index.add_node(node)
+
+    def _add_row(self, raw_node: n4_graph.Node, identity_map: dict):
+        """
+        adds a raw node to the table of its class (`GenericNode`s, which have no fixed columns, as objects)
+        """
+        node_type, dyn_labels = self.model._infer_node_type(raw_node.labels)
+        if node_type is GenericNode:
+            self.add_node(self.model.resolve_node(raw_node, identity_map))
+            return
+        table = self.tables.get(node_type)
+        if table is None:
+            table = self.tables[node_type] = NodeTable(node_type)
+        identity_map[_identity_key(raw_node)] = table.append(
+            raw_node._properties.get("uuid"), dyn_labels, raw_node._properties
+        )
+
+    def node(self, uuid: str) -> Optional[Node | NodeView]:
+        """
+        the node object or, in a compact graph, the view of the node with `uuid`
+        """
+        node = self.nodes.get(uuid)
+        if node is None:
+            for table in self.tables.values():
+                view = table.view(uuid)
+                if view is not None:
+                    return view
+        return node
+
+    def _expand(self, nodes: List[Node]):
+        """
+        hook called before the connections of `nodes` are traversed;
+        graphs loading connections on demand (see `ogr.lazy.LazyGraph`) fetch them here
+        """
+
+    def _materialize(self, node: Node | NodeView) -> Node:
+        if isinstance(node, NodeView):
+            node = node.materialize()
+            self.add_node(node)
+        return node
+
+    def add_connection(self, connection: Connection):
+        """
+        adds an already persisted connection to the graph without recording a change
+        """
+        self.connections[connection.uuid] = connection
+        self.index.add_connection(connection)
 
     def create_node(self, node: Node):
         node.uuid = uuid7str()
-        self.nodes[node.uuid] = node
-        self.performed_ops.append(partial(_write_create_node, node=node))
+        self.add_node(node)
+        self.changes.create(node)
 
-    def delete_node(self, node: Node):
+    def delete_node(self, node: Node | NodeView):
+        node = self._materialize(node)
         del self.nodes[node.uuid]
-        self.performed_ops.append(partial(_write_delete_node, node=node))
+        # the database detaches the node's connections, so they are dropped locally as well
+        for connection in list(self.index.edges_of(node.uuid)):
+            self._remove_connection(connection)
+        self.index.remove_node(node)
+        self.changes.delete(node)
 
-    def set_node(self, node: Node):
-        self.nodes[node.uuid] = node
-        self.performed_ops.append(partial(_write_set_node, node=node))
+    def set_node(self, node: Node | NodeView):
+        node = self._materialize(node)
+        self.add_node(node)
+        self.changes.set(node)
 
     def create_connection(self, connection: Connection):
         connection.uuid = uuid7str()
-        self.connections[connection.uuid] = connection
-        self.performed_ops.append(
-            partial(_write_create_connection, connection=connection)
-        )
+        self.add_connection(connection)
+        self.changes.create(connection)
         return connection
 
     def delete_connection(self, connection: Connection):
-        del self.connections[connection.uuid]
-        self.performed_ops.append(
-            partial(_write_delete_connection, connection=connection)
-        )
+        self._remove_connection(self.connections[connection.uuid])
+        self.changes.delete(connection)
 
     def set_connection(self, connection: Connection):
-        self.connections[connection.id] = connection
-        self.performed_ops.append(partial(_write_set_connection, connection=connection))
-
-
-def _write_create_connection(tx: n4.Transaction, connection: Connection) -> Connection:
-    sub_dict = attrs.asdict(
-        connection, filter=attrs.filters.exclude(*attrs.fields(Connection))
-    )
-    prop_arg_name_string = ", ".join([f"{key}: ${key}" for key in sub_dict.keys()])
-    tx.run(
-        f"""
-        MATCH (a {{uuid: $uuid_a}}), (b {{uuid: $uuid_b}})
-        CREATE (a)-[c:{connection.type} {{uuid: $uuid_c, {prop_arg_name_string}}}]->(b)
-        """,
-        uuid_a=connection.node_a.uuid,
-        uuid_b=connection.node_b.uuid,
-        uuid_c=connection.uuid,
-        **sub_dict,
-    ).consume()
+        # re-indexes the connection, whose ends may have been reassigned
+        self.add_connection(connection)
+        self.changes.set(connection)
+
+    def _remove_connection(self, connection: Connection):
+        del self.connections[connection.uuid]
+        self.index.remove_connection(connection)
+
+    def nodes_with_label(self, label: str) -> List[Node | NodeView]:
+        nodes = list(self.index.by_label.get(label, {}).values())
+        for table in self.tables.values():
+            if label in table.cls.labels:
+                nodes.extend(table)
+            else:
+                nodes.extend(view for view in table if label in view.dyn_labels)
+        return nodes
+
+    def connections_of_type(
+        self, connection_type: MetaConnection | str
+    ) -> List[Connection]:
+        (type_name,) = connection_types([connection_type])
+        return list(self.index.by_type.get(type_name, {}).values())
+
+    def edges_of(
+        self, node: Node, direction: str = BOTH, types: Optional[Iterable] = None
+    ) -> List[Connection]:
+        """
+        connections of `node` in the graph.
+        Args
+        :direction: `"out"`, `"in"` or `"both"`
+        :types: connection classes or type names to follow, default is all types
+        """
+        self._expand([node])
+        return list(self.index.edges_of(node.uuid, direction, connection_types(types)))
+
+    def neighbors(
+        self, node: Node, direction: str = BOTH, types: Optional[Iterable] = None
+    ) -> List[Node]:
+        """
+        distinct nodes connected to `node` via connections in `direction` of `types`, see `edges_of`
+        """
+        self._expand([node])
+        neighbors = {}
+        for connection in self.index.edges_of(
+            node.uuid, direction, connection_types(types)
+        ):
+            other = _other_end(connection, node.uuid)
+            neighbors[other.uuid] = other
+        return list(neighbors.values())
+
+    def bfs(
+        self,
+        start: Node,
+        max_depth: Optional[int] = None,
+        direction: str = BOTH,
+        types: Optional[Iterable] = None,
+    ) -> Iterator[Tuple[Node, int]]:
+        """
+        yields `(node, depth)` for every node reachable from `start` within `max_depth` hops
+        (unbounded if `None`) in breadth-first order, starting with `(start, 0)`
+        """
+        types = connection_types(types)
+        seen = {start.uuid}
+        frontier = [start]
+        depth = 0
+        while frontier:
+            for node in frontier:
+                yield node, depth
+            if max_depth is not None and depth >= max_depth:
+                return
+            self._expand(frontier)
+            next_frontier = []
+            for node in frontier:
+                for connection in self.index.edges_of(node.uuid, direction, types):
+                    other = _other_end(connection, node.uuid)
+                    if other.uuid not in seen:
+                        seen.add(other.uuid)
+                        next_frontier.append(other)
+            frontier = next_frontier
+            depth += 1
+
+    def shortest_path(
+        self,
+        start: Node,
+        end: Node,
+        max_depth: Optional[int] = None,
+        direction: str = BOTH,
+        types: Optional[Iterable] = None,
+    ) -> Optional[List[Connection]]:
+        """
+        returns the connections of a shortest path from `start` to `end` with at most `max_depth` hops,
+        or `None` if there is none
+        """
+        types = connection_types(types)
+        via: Dict[str, Optional[Connection]] = {start.uuid: None}
+        frontier = [start]
+        depth = 0
+        while frontier and end.uuid not in via:
+            if max_depth is not None and depth >= max_depth:
+                break
+            depth += 1
+            self._expand(frontier)
+            next_frontier = []
+            for node in frontier:
+                for connection in self.index.edges_of(node.uuid, direction, types):
+                    other = _other_end(connection, node.uuid)
+                    if other.uuid not in via:
+                        via[other.uuid] = connection
+                        next_frontier.append(other)
+            frontier = next_frontier
+        if end.uuid not in via:
+            return None
+        path = []
+        uuid = end.uuid
+        while via[uuid] is not None:
+            connection = via[uuid]
+            path.append(connection)
+            uuid = _other_end(connection, uuid).uuid
+        path.reverse()
+        return path
+
+
+def _identity_key(raw_entity: n4_graph.Entity) -> str:
+    return raw_entity._properties.get("uuid") or raw_entity.element_id
+
+
+def _other_end(connection: Connection, node_uuid: str) -> Node:
+    if connection.node_a.uuid == node_uuid:
+        return connection.node_b
+    return connection.node_a
+
+
+def _write_create_connection(tx: n4.Transaction, connection: Connection):
+    tx.run(*template_of(type(connection)).create(connection)).consume()
 
 
 def _write_set_connection(tx: n4.Transaction, connection: Connection):
-    sub_dict = attrs.asdict(
-        connection, filter=attrs.filters.exclude(*attrs.fields(Connection))
-    )
-    prop_arg_name_string = ", ".join([f"{key}: ${key}" for key in sub_dict.keys()])
-    tx.run(
-        f"""
-        MATCH (a)-[c:{connection.type} {{uuid: $uuid_c}}]->(b)
-        SET c = {{{prop_arg_name_string}}}
-        """,
-        uuid_c=connection.uuid,
-        **sub_dict,
-    ).consume()
+    tx.run(*template_of(type(connection)).set(connection)).consume()
 
 
 def _write_delete_connection(tx: n4.Transaction, connection: Connection):
-    tx.run(
-        f"""
-        MATCH (a)-[c:{connection.type} {{uuid: $uuid_c}}]->(b)
-        DELETE c
-        """,
-        uuid_c=connection.uuid,
-    ).consume()
+    tx.run(*template_of(type(connection)).delete(connection)).consume()
 
 
 def _write_create_node(tx: n4.Transaction, node: Node):
-    sub_dict = attrs.asdict(node, filter=attrs.filters.exclude(*attrs.fields(Node)))
-    prop_arg_name_string = ", ".join([f"{key}: ${key}" for key in sub_dict.keys()])
-    tx.run(
-        f"""
-        CREATE (n:{":".join(type(node).labels.union(node.dyn_labels))} {{uuid: $uuid, {prop_arg_name_string}}})
-        RETURN n.uuid AS uuid
-        """,
-        uuid=node.uuid,
-        **sub_dict,
-    ).consume()
+    tx.run(*template_of(type(node)).create(node)).consume()
 
 
 def _write_set_node(tx: n4.Transaction, node: Node):
-    sub_dict = attrs.asdict(node, filter=attrs.filters.exclude(*attrs.fields(Node)))
-    prop_arg_name_string = ", ".join([f"n.{key} = ${key}" for key in sub_dict.keys()])
-    tx.run(
-        f"""
-        MATCH (n:{", ".join(type(node).labels.union(node.dyn_labels))} {{uuid: $uuid}})
-        FOREACH (label IN labels(n) | REMOVE n:label)
-        SET n:{":".join(node.dyn_labels + node.labels)} {{{prop_arg_name_string}}}
-        """,
-        uuid=node.uuid,
-        **sub_dict,
-    ).consume()
+    tx.run(*template_of(type(node)).set(node)).consume()
 
 
 def _write_delete_node(tx: n4.Transaction, node: Node):
-    tx.run(
-        f"""
-        MATCH (n:{", ".join(type(node).labels.union(node.dyn_labels))} {{uuid: $uuid}})
-        DETACH DELETE n
-        """,
-        uuid=node.uuid,
-    ).consume()
+    tx.run(*template_of(type(node)).delete(node)).consume()
+
+
+_WRITE_OPS = {
+    "create_node": _write_create_node,
+    "set_node": _write_set_node,
+    "delete_node": _write_delete_node,
+    "create_connection": _write_create_connection,
+    "set_connection": _write_set_connection,
+    "delete_connection": _write_delete_connection,
+}
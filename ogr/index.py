@@ -0,0 +1,92 @@
+from __future__ import annotations
+from typing import Dict, FrozenSet, Iterable, Iterator, Optional, Set, Tuple
+from ogr.node import Node, intern_labels
+from ogr.connection import Connection
+
+OUT, IN, BOTH = "out", "in", "both"
+
+
+class GraphIndex:
+    """
+    Indexes of an in memory graph, maintained incrementally as nodes and connections are added or removed:
+    outgoing and incoming connections per node uuid, connections per type and nodes per label.
+    """
+
+    def __init__(self):
+        # node.uuid: {connection.uuid: connection}
+        self.outgoing: Dict[str, Dict[str, Connection]] = {}
+        self.incoming: Dict[str, Dict[str, Connection]] = {}
+        self.by_type: Dict[str, Dict[str, Connection]] = {}  # type: {uuid: connection}
+        self.by_label: Dict[str, Dict[str, Node]] = {}  # label: {uuid: node}
+        self._node_labels: Dict[str, FrozenSet[str]] = {}  # node.uuid: indexed labels
+        # connection.uuid: indexed (node_a.uuid, node_b.uuid, type), as a connection's ends may be reassigned
+        self._connection_keys: Dict[str, Tuple[str, str, str]] = {}
+
+    def add_node(self, node: Node):
+        labels = intern_labels(node.labels.union(node.dyn_labels))
+        old_labels = self._node_labels.get(node.uuid, frozenset())
+        for label in old_labels.difference(labels):
+            _discard(self.by_label, label, node.uuid)
+        for label in labels:
+            self.by_label.setdefault(label, {})[node.uuid] = node
+        self._node_labels[node.uuid] = labels
+
+    def remove_node(self, node: Node):
+        for label in self._node_labels.pop(node.uuid, ()):
+            _discard(self.by_label, label, node.uuid)
+        self.outgoing.pop(node.uuid, None)
+        self.incoming.pop(node.uuid, None)
+
+    def add_connection(self, connection: Connection):
+        uuid = connection.uuid
+        self.remove_connection(connection)
+        keys = connection.node_a.uuid, connection.node_b.uuid, connection.type
+        self.outgoing.setdefault(keys[0], {})[uuid] = connection
+        self.incoming.setdefault(keys[1], {})[uuid] = connection
+        self.by_type.setdefault(keys[2], {})[uuid] = connection
+        self._connection_keys[uuid] = keys
+
+    def remove_connection(self, connection: Connection):
+        uuid = connection.uuid
+        keys = self._connection_keys.pop(uuid, None)
+        if keys is not None:
+            _discard(self.outgoing, keys[0], uuid)
+            _discard(self.incoming, keys[1], uuid)
+            _discard(self.by_type, keys[2], uuid)
+
+    def edges_of(
+        self,
+        node_uuid: str,
+        direction: str = BOTH,
+        types: Optional[Set[str]] = None,
+    ) -> Iterator[Connection]:
+        if direction not in (OUT, IN, BOTH):
+            raise ValueError(f"direction must be one of {OUT!r}, {IN!r}, {BOTH!r}")
+        if direction != IN:
+            for connection in self.outgoing.get(node_uuid, {}).values():
+                if types is None or connection.type in types:
+                    yield connection
+        if direction != OUT:
+            for connection in self.incoming.get(node_uuid, {}).values():
+                # self loops are outgoing as well, so they are yielded only once
+                if direction == BOTH and connection.node_a.uuid == node_uuid:
+                    continue
+                if types is None or connection.type in types:
+                    yield connection
+
+
+def connection_types(types: Optional[Iterable]) -> Optional[Set[str]]:
+    """
+    normalises connection classes or type names to a set of type names
+    """
+    if types is None:
+        return None
+    return {x if isinstance(x, str) else x.type for x in types}
+
+
+def _discard(index: Dict[str, dict], key: str, uuid: str):
+    entries = index.get(key)
+    if entries is not None:
+        entries.pop(uuid, None)
+        if not entries:
+            del index[key]
@@ -0,0 +1,327 @@
+from __future__ import annotations
+import attrs
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# upper bounds (seconds) of the latency histogram buckets; larger latencies fall into a last "+Inf" bucket
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# upper bounds of the ops per flush histogram buckets
+FLUSH_SIZE_BUCKETS: Tuple[int, ...] = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+SUMMARY_COUNTERS: Tuple[str, ...] = (
+    "nodes_created",
+    "nodes_deleted",
+    "relationships_created",
+    "relationships_deleted",
+    "properties_set",
+    "labels_added",
+    "labels_removed",
+)
+
+
+@attrs.define
+class StatementEvent:
+    """
+    Emitted once a statement's result has been consumed.
+    `query` is the statement text (a template; values are passed as parameters), `rows` the number
+    of `UNWIND` rows sent (1 for single statements), `bytes` the approximate size of query and parameters,
+    and `summary` the server's `ResultSummary` (`None` if the statement failed).
+    """
+
+    operation: str
+    query: str
+    rows: int
+    bytes: int
+    duration: float
+    summary: Optional[Any] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        counters = getattr(self.summary, "counters", None)
+        return {name: getattr(counters, name, 0) for name in SUMMARY_COUNTERS}
+
+
+@attrs.define
+class FlushEvent:
+    """
+    Emitted once per write of a graph's change set.
+    """
+
+    operation: str
+    changes: int
+    duration: float
+    error: Optional[BaseException] = None
+
+
+Event = StatementEvent | FlushEvent
+Hook = Callable[[Event], None]
+
+
+class Histogram:
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        buckets = [str(bound) for bound in self.bounds] + ["+Inf"]
+        return {
+            "buckets": dict(zip(buckets, self.counts)),
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+class Metrics:
+    """
+    Aggregates events per operation: statement counts, latency histograms, rows, bytes, errors,
+    server counters and the number of changes per flush.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._statements: Dict[str, dict] = {}
+        self._flushes: Dict[str, dict] = {}
+
+    def __call__(self, event: Event):
+        with self._lock:
+            if isinstance(event, StatementEvent):
+                stats = self._statements.get(event.operation)
+                if stats is None:
+                    stats = self._statements[event.operation] = {
+                        "statements": 0,
+                        "errors": 0,
+                        "rows": 0,
+                        "bytes": 0,
+                        "latency": Histogram(LATENCY_BUCKETS),
+                        "counters": dict.fromkeys(SUMMARY_COUNTERS, 0),
+                    }
+                stats["statements"] += 1
+                stats["errors"] += event.error is not None
+                stats["rows"] += event.rows
+                stats["bytes"] += event.bytes
+                stats["latency"].observe(event.duration)
+                for name, value in event.counters.items():
+                    stats["counters"][name] += value
+            else:
+                stats = self._flushes.get(event.operation)
+                if stats is None:
+                    stats = self._flushes[event.operation] = {
+                        "flushes": 0,
+                        "errors": 0,
+                        "changes": Histogram(FLUSH_SIZE_BUCKETS),
+                        "latency": Histogram(LATENCY_BUCKETS),
+                    }
+                stats["flushes"] += 1
+                stats["errors"] += event.error is not None
+                stats["changes"].observe(event.changes)
+                stats["latency"].observe(event.duration)
+
+    def snapshot(self) -> dict:
+        """
+        a plain (e.g. JSON serialisable) copy of the aggregated metrics
+        """
+        with self._lock:
+            return {
+                "statements": {
+                    operation: _plain(stats)
+                    for operation, stats in self._statements.items()
+                },
+                "flushes": {
+                    operation: _plain(stats)
+                    for operation, stats in self._flushes.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._flushes.clear()
+
+
+class Instrumentation:
+    """
+    Passes events around every Cypher statement and every flush of a `DataModel` to `hooks`
+    and aggregates them in `metrics`.
+    A model without instrumentation does not wrap its transactions at all.
+    """
+
+    def __init__(self, *hooks: Hook):
+        self.metrics = Metrics()
+        self.hooks: List[Hook] = [self.metrics, *hooks]
+
+    def add_hook(self, hook: Hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Hook):
+        self.hooks.remove(hook)
+
+    def emit(self, event: Event):
+        for hook in self.hooks:
+            hook(event)
+
+    def transaction(self, tx, operation: str) -> InstrumentedTransaction:
+        return InstrumentedTransaction(tx, self, operation)
+
+    def async_transaction(self, tx, operation: str) -> AsyncInstrumentedTransaction:
+        return AsyncInstrumentedTransaction(tx, self, operation)
+
+
+class InstrumentedTransaction:
+    """
+    Wraps a transaction (or session) and emits a `StatementEvent` per statement run through it.
+    """
+
+    def __init__(self, tx, instrumentation: Instrumentation, operation: str):
+        self._tx = tx
+        self._instrumentation = instrumentation
+        self._operation = operation
+
+    def __getattr__(self, name: str):
+        return getattr(self._tx, name)
+
+    def run(self, query: str, parameters: Optional[dict] = None, **kwargs):
+        parameters = {**(parameters or {}), **kwargs}
+        event = _statement_event(self._operation, query, parameters)
+        start = time.perf_counter()
+        try:
+            result = self._tx.run(query, parameters)
+        except BaseException as error:
+            event.error = error
+            event.duration = time.perf_counter() - start
+            self._instrumentation.emit(event)
+            raise
+        return InstrumentedResult(result, self._instrumentation, event, start)
+
+
+class AsyncInstrumentedTransaction(InstrumentedTransaction):
+    """
+    Wraps an async transaction (or session) and emits a `StatementEvent` per statement run through it.
+    """
+
+    async def run(self, query: str, parameters: Optional[dict] = None, **kwargs):
+        parameters = {**(parameters or {}), **kwargs}
+        event = _statement_event(self._operation, query, parameters)
+        start = time.perf_counter()
+        try:
+            result = await self._tx.run(query, parameters)
+        except BaseException as error:
+            event.error = error
+            event.duration = time.perf_counter() - start
+            self._instrumentation.emit(event)
+            raise
+        return AsyncInstrumentedResult(result, self._instrumentation, event, start)
+
+
+class InstrumentedResult:
+    """
+    Wraps a result and emits its `StatementEvent` once it is consumed, materialised or exhausted.
+    """
+
+    def __init__(self, result, instrumentation: Instrumentation, event, start: float):
+        self._result = result
+        self._instrumentation = instrumentation
+        self._event = event
+        self._start = start
+
+    def __getattr__(self, name: str):
+        return getattr(self._result, name)
+
+    def __iter__(self):
+        yield from self._result
+        self._emit(self._result.consume())
+
+    def consume(self):
+        try:
+            summary = self._result.consume()
+        except BaseException as error:
+            self._emit(None, error)
+            raise
+        self._emit(summary)
+        return summary
+
+    def graph(self):
+        graph = self._result.graph()
+        self._emit(self._result.consume())
+        return graph
+
+    def _emit(self, summary, error: Optional[BaseException] = None):
+        if self._event is None:
+            return
+        event, self._event = self._event, None
+        event.duration = time.perf_counter() - self._start
+        event.summary = summary
+        event.error = error
+        self._instrumentation.emit(event)
+
+
+class AsyncInstrumentedResult(InstrumentedResult):
+    """
+    Wraps an async result and emits its `StatementEvent` once it is consumed, materialised or exhausted.
+    """
+
+    def __aiter__(self) -> AsyncInstrumentedResult:
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._result.__anext__()
+        except StopAsyncIteration:
+            self._emit(await self._result.consume())
+            raise
+
+    async def consume(self):
+        try:
+            summary = await self._result.consume()
+        except BaseException as error:
+            self._emit(None, error)
+            raise
+        self._emit(summary)
+        return summary
+
+    async def graph(self):
+        graph = await self._result.graph()
+        self._emit(await self._result.consume())
+        return graph
+
+
+def _statement_event(operation: str, query: str, parameters: dict) -> StatementEvent:
+    """
+    the event of a statement about to be run, timed and completed once its result is consumed
+    """
+    return StatementEvent(
+        operation=operation,
+        query=query,
+        rows=len(parameters["rows"]) if "rows" in parameters else 1,
+        bytes=len(query) + _payload_size(parameters),
+        duration=0.0,
+    )
+
+
+def _payload_size(value) -> int:
+    """
+    rough size of a parameter value in bytes
+    """
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(key) + _payload_size(x) for key, x in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(x) for x in value)
+    return 8
+
+
+def _plain(stats: dict) -> dict:
+    return {
+        key: value.snapshot() if isinstance(value, Histogram) else value
+        for key, value in stats.items()
+    }
@@ -0,0 +1,112 @@
+from __future__ import annotations
+from collections import ChainMap
+from typing import Iterable, List, Optional, Set
+from ogr.graph import Graph
+from ogr.index import connection_types
+from ogr.node import Node
+from ogr.template import _labels
+
+
+class LazyGraph(Graph):
+    """
+    A graph around a base node whose connections are fetched hop by hop as it is traversed.
+    Before `neighbors`, `edges_of`, `bfs` or `shortest_path` follow the connections of a node,
+    the connections (of the graph's connection `types`, in both directions) of all not yet expanded nodes
+    of the current frontier are fetched with a single query.
+    At most `fan_out` connections are fetched per node and hop; nodes that hit the limit are kept in `truncated`.
+
+    ```
+    graph = model.read_subgraph_lazy(person, with_conns={Knows}, prefetch_depth=1, fan_out=100)
+    for node, depth in graph.bfs(person, max_depth=3):  # hops 2 and 3 are fetched here
+        ...
+    ```
+    """
+
+    def __init__(
+        self,
+        model,
+        with_conns: Optional[Iterable] = None,
+        fan_out: Optional[int] = None,
+    ):
+        super().__init__(model)
+        if fan_out is not None and fan_out < 1:
+            raise ValueError(f"fan_out must be positive, got {fan_out}")
+        self.types: Set[str] = connection_types(with_conns) or set()
+        self.fan_out = fan_out
+        self.expanded: Set[str] = set()  # uuids of nodes whose connections are loaded
+        self.truncated: Set[str] = set()  # uuids of expanded nodes that hit `fan_out`
+
+    def expand(self, nodes: Iterable[Node]) -> List[Node]:
+        """
+        fetches the connections of all `nodes` not expanded yet in one query
+        and returns the nodes newly added to the graph
+        """
+        pending = {}
+        for node in nodes:
+            if node.uuid not in self.expanded:
+                pending[node.uuid] = node
+        if not pending or not self.types:
+            self.expanded.update(pending)
+            return []
+        query = _expand_query(
+            {min(node.labels, default=None) for node in pending.values()},
+            self.types,
+            self.fan_out,
+        )
+        # resolve against the objects already in the graph, so every entity exists once
+        identity_map = ChainMap({}, self.nodes, self.connections)
+        new_nodes = []
+        fan_outs = dict.fromkeys(pending, 0)
+        with self.model.session() as session:
+            with session.begin_transaction() as tx:
+                tx = self.model._instrument(tx, "expand")
+                results = tx.run(query, uuids=list(pending), fan_out=self.fan_out)
+                for record in results:
+                    connection = self.model.resolve_connection(
+                        record["c"], identity_map
+                    )
+                    for node in (connection.node_a, connection.node_b):
+                        if node.uuid not in self.nodes:
+                            self.add_node(node)
+                            new_nodes.append(node)
+                    if connection.uuid not in self.connections:
+                        self.add_connection(connection)
+                    fan_outs[record["uuid"]] += 1
+                results.consume()
+        self.expanded.update(pending)
+        if self.fan_out is not None:
+            self.truncated.update(x for x, n in fan_outs.items() if n >= self.fan_out)
+        return new_nodes
+
+    def _expand(self, nodes: List[Node]):
+        self.expand(nodes)
+
+
+def _expand_query(
+    labels: Set[Optional[str]], types: Set[str], fan_out: Optional[int]
+) -> str:
+    """
+    query returning the connections `c` of every node with a uuid in `$uuids`, at most `$fan_out` per node.
+    Nodes are looked up by one label per class (`None` for unlabeled nodes, which are scanned).
+    """
+    lookup = "UNION".join(
+        f"""
+            WITH uuid
+            MATCH (a{_labels([label] if label else [])} {{uuid: uuid}})
+            RETURN a
+            """
+        for label in sorted(labels, key=lambda x: x or "")
+    )
+    return f"""
+        UNWIND $uuids AS uuid
+        CALL {{
+            {lookup}
+        }}
+        CALL {{
+            WITH a
+            MATCH (a)-[c:{"|".join(sorted(types))}]-(b)
+            RETURN c, b
+            {"LIMIT $fan_out" if fan_out is not None else ""}
+        }}
+        RETURN uuid, c, a, b
+        """
@@ -1,25 +1,144 @@
 import attrs
+import re
+import threading
+import time
+from datetime import datetime
 import neo4j as n4
 import neo4j.graph as n4_graph
+from contextlib import contextmanager
 from functools import partial
-from typing import Dict, FrozenSet, Set
-from ogr.graph import Graph
-from ogr.node import Node, MetaNode
-from ogr.result import Result
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from ogr.graph import Graph, _identity_key
+from ogr.batch import Batch, plan_batches
+from ogr.columns import column_lists
+from ogr.lazy import LazyGraph
+from ogr.parallel import FlushReport, ParallelFlushError, write_parallel
+from ogr.resumable import ChunkSize, ResumableFlushError, write_resumable
+from ogr.node import GenericNode, Node, MetaNode
+from ogr.result import Lookup, Result
+from ogr.cache import ObjectCache, QueryCache
+from ogr.instrumentation import FlushEvent, Instrumentation
+from ogr.schema import AWAIT_INDEXES, SHOW_INDEXES, SchemaError, uuid_schema
+from ogr.template import _labels, compile_template, template_of
 from ogr.connection import Connection, MetaConnection
+from ogr.changes import Change
+from ogr.index import connection_types
 from ogr.external.metaclass import metaclass
+from uuid_extensions import uuid7, uuid7str
+
+# uuids, labels and connection types a cached read depends on, `None` standing for any
+Dependencies = Tuple[Iterable[str], Optional[Iterable[str]], Optional[Iterable[str]]]
 
 
 class DataModel:
-    # TODO index uuid in db
     # TODO think about how to bind database access to data model; potentially define a function to set the db
-    def __init__(self, uri: str, auth: str, data_base: str = "neo4j"):
+    def __init__(
+        self,
+        uri: str,
+        auth: str,
+        data_base: str = "neo4j",
+        max_connection_pool_size: int = 100,
+        connection_acquisition_timeout: float = 60.0,
+        max_connection_lifetime: float = 3600.0,
+        driver_factory: Callable[..., n4.Driver] = n4.GraphDatabase.driver,
+        object_cache: Optional[ObjectCache] = None,
+        query_cache: Optional[QueryCache] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         self.uri, self.auth = uri, auth
         self.data_base_name: str = data_base
         self.registered_nodes = []
         self.label_nodes_lut: Dict[FrozenSet, Node] = {}
+        self._label_index: Dict[str, List[MetaNode]] = {}  # label: classes carrying it
+        self._node_rank: Dict[MetaNode, int] = {}  # class: registration order
+        self._node_type_memo: Dict[FrozenSet[str], Tuple[MetaNode, FrozenSet[str]]] = {}
         self.registered_connections = []
         self.type_connections_lut: Dict[str, Connection] = {}
+        # uuid lookups over all registered labels / types (single and `UNWIND`), compiled on first use
+        self._node_by_uuid: Dict[bool, str] = {}
+        self._connection_by_uuid: Dict[bool, str] = {}
+        self.pool_config = {
+            "max_connection_pool_size": max_connection_pool_size,
+            "connection_acquisition_timeout": connection_acquisition_timeout,
+            "max_connection_lifetime": max_connection_lifetime,
+        }
+        self.driver_factory = driver_factory
+        self.driver: Optional[n4.Driver] = None
+        self.object_cache = object_cache
+        self.query_cache = query_cache
+        self.instrumentation = instrumentation
+        self._driver_lock = threading.Lock()
+        self._local = threading.local()
+
+    def open(self) -> "DataModel":
+        """
+        opens the long-lived driver (and with it the connection pool) shared by all database calls.
+        Calling `open` on an already opened model is a no-op.
+        """
+        with self._driver_lock:
+            if self.driver is None:
+                driver = self.driver_factory(
+                    self.uri, auth=self.auth, **self.pool_config
+                )
+                driver.verify_connectivity()
+                self.driver = driver
+        return self
+
+    def close(self):
+        """
+        closes the shared driver and all pooled connections
+        """
+        with self._driver_lock:
+            if self.driver is not None:
+                self.driver.close()
+                self.driver = None
+
+    def __enter__(self) -> "DataModel":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextmanager
+    def session(self, **config) -> Iterator[n4.Session]:
+        """
+        yields a session from the pool; the driver is opened on first use.
+        While the session is open, all database calls of this model on the same thread reuse it,
+        so several reads can share one session.
+        Objects resolved within the session are kept in an identity map, so every database entity
+        is materialised only once per session:
+
+        ```
+        with model.session():
+            a = model.get_node_by_uuid(uuid_a)
+            b = model.get_node_by_uuid(uuid_b)
+        ```
+        """
+        bound = getattr(self._local, "session", None)
+        if bound is not None:
+            yield bound
+            return
+        if self.driver is None:
+            self.open()
+        with self.driver.session(database=self.data_base_name, **config) as session:
+            self._local.session = session
+            self._local.identity_map = {}
+            try:
+                yield session
+            finally:
+                self._local.session = None
+                self._local.identity_map = None
 
     def register_node(self, cls_or_labels: type | FrozenSet[str] = None):
         def wrap_class(cls: type, labels):
@@ -27,8 +146,14 @@ class DataModel:
             cls_defined = attrs.define(kw_only=True)(cls_meta_wrapped)
             if labels:
                 cls_defined.labels = labels
+            compile_template(cls_defined)
             self.registered_nodes.append(cls_defined)
             self.label_nodes_lut[cls_defined.labels] = cls_defined
+            self._node_rank[cls_defined] = len(self._node_rank)
+            for label in cls_defined.labels:
+                self._label_index.setdefault(label, []).append(cls_defined)
+            self._node_type_memo.clear()
+            self._node_by_uuid.clear()
             return cls_defined
 
         if isinstance(cls_or_labels, FrozenSet):
@@ -41,152 +166,873 @@ class DataModel:
     def register_connection(self, cls):
         cls_meta_wrapped = metaclass(MetaConnection)(cls)
         cls_defined = attrs.define(kw_only=True)(cls_meta_wrapped)
+        compile_template(cls_defined)
         self.registered_connections.append(cls_defined)
         self.type_connections_lut[cls_defined.type] = cls_defined
+        self._connection_by_uuid.clear()
         return cls_defined
 
-    def write_graph(self, graph: Graph):
+    def ensure_schema(self, unique: bool = True, timeout: int = 300) -> Dict[str, str]:
         """
-        write changes performed on the `graph` to the database
+        creates a uniqueness constraint (or, if not `unique`, a range index) on `uuid` for every
+        label of the registered node classes and every registered connection type, unless it exists,
+        and waits up to `timeout` seconds for the indexes to come online.
+        Returns the state of every index by name; raises `SchemaError` if any is missing or not online.
+        Uuid lookups, sets and deletes match by label or type, so they can use these indexes.
         """
-        with n4.GraphDatabase.driver(self.uri, auth=self.auth) as driver:
-            driver.verify_connectivity()
-            with driver.session(database=self.data_base_name) as session:
-                with session.begin_transaction() as tx:
-                    for x in graph.performed_ops:
-                        x(tx)
-                        print(f"wrote {x}")
+        statements = uuid_schema(
+            (label for cls in self.registered_nodes for label in cls.labels),
+            (cls.type for cls in self.registered_connections),
+            unique,
+        )
+        with self.session() as session:
+            session = self._instrument(session, "ensure_schema")
+            for statement in statements.values():
+                session.run(statement).consume()
+            session.run(AWAIT_INDEXES, timeout=timeout).consume()
+            states = {
+                record["name"]: record["state"]
+                for record in session.run(SHOW_INDEXES, names=list(statements))
+            }
+        failed = [
+            f"{name} ({states.get(name, 'missing')})"
+            for name in statements
+            if states.get(name) != "ONLINE"
+        ]
+        if failed:
+            raise SchemaError(f"uuid indexes not online: {', '.join(failed)}")
+        return states
 
-    def get_node_by_uuid(self, uuid: str):
+    def write_graph(self, graph: Graph, batch_size: Optional[int] = None):
         """
-        queries database for the node by uuid
+        write changes performed on the `graph` to the database.
+        If `batch_size` is given, the changes are grouped by kind and label set / connection type
+        and sent as `UNWIND` statements of at most `batch_size` rows each instead of one statement per change.
+        Once the transaction is committed, the graph's change set is cleared.
         """
-        with n4.GraphDatabase.driver(self.uri, auth=self.auth) as driver:
-            driver.verify_connectivity()
-            with driver.session(database=self.data_base_name) as session:
+        with self._flushing(graph, "write_graph"):
+            with self.session() as session:
                 with session.begin_transaction() as tx:
-                    results: n4.Result = tx.run(
-                        """
-                        MATCH (a {uuid: $uuid})
-                        RETURN a
-                        """,
-                        uuid=uuid,
+                    tx = self._instrument(tx, "write_graph")
+                    if batch_size is not None:
+                        for batch in plan_batches(graph.changes, batch_size):
+                            batch.run(tx)
+                    else:
+                        for x in graph.performed_ops:
+                            x(tx)
+
+    def write_graph_parallel(
+        self, graph: Graph, workers: int = 4, batch_size: int = 1000
+    ) -> FlushReport:
+        """
+        write changes performed on the `graph` to the database concurrently:
+        the changes are split into independent `UNWIND` chunks of at most `batch_size` rows,
+        which are committed in transactions of their own from a pool of `workers` sessions.
+        Phases respect dependencies (node writes, then connection writes, then connection deletes,
+        then node deletes), see `ogr.parallel`.
+        Raises `ParallelFlushError` carrying a `FlushReport` if any chunk failed; the changes of failed
+        and skipped chunks stay in the change set, so the flush can be repeated.
+        """
+        with self._flushing(graph, "write_graph_parallel"):
+            report = write_parallel(self, graph, workers, batch_size)
+            if not report.ok:
+                raise ParallelFlushError(report)
+        return report
+
+    def write_graph_resumable(
+        self,
+        graph: Graph,
+        chunk_size: int = 1000,
+        min_chunk_size: int = 1,
+        max_chunk_size: int = 50_000,
+        target_latency: float = 1.0,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+    ) -> FlushReport:
+        """
+        write changes performed on the `graph` to the database in chunks, for change sets too large for one transaction:
+        the changes are committed in order as `UNWIND` chunks, each in a transaction of its own.
+        Chunks failing with transient errors are retried up to `max_retries` times with exponential `backoff`,
+        and the chunk size (starting at `chunk_size`) adapts to the commit latency, see `ogr.resumable`.
+        The changes of committed chunks are removed from the change set as they commit; if a chunk fails for good,
+        `ResumableFlushError` carrying a `FlushReport` is raised and flushing again resumes where it stopped.
+        With uniqueness constraints (see `ensure_schema`), a retried create that was in fact committed fails
+        instead of creating a duplicate.
+        """
+        size = ChunkSize(chunk_size, min_chunk_size, max_chunk_size, target_latency)
+        with self._flushing(graph, "write_graph_resumable"):
+            report = write_resumable(self, graph, size, max_retries, backoff)
+            if not report.ok:
+                raise ResumableFlushError(report)
+        return report
+
+    def from_columns(
+        self,
+        cls: MetaNode | MetaConnection,
+        columns: Dict[str, Sequence],
+        endpoints: Optional[Tuple[MetaNode, MetaNode]] = None,
+        batch_size: int = 10_000,
+    ) -> List[str]:
+        """
+        creates nodes or connections of class `cls` in bulk from columns (NumPy arrays, lists or other sequences
+        of equal length, see also `Graph.to_columns`), without building node or connection objects:
+        the rows are sent as `UNWIND` statements of at most `batch_size` rows, each committed in a transaction
+        of its own, so on failure the batches sent before stay committed.
+        Columns are named by property; properties without a column are not set, and uuid7s are assigned
+        unless there is a `uuid` column. Connections take the uuids of their start and end nodes in columns
+        `node_a` and `node_b`, matched by the labels of the `endpoints` classes, which are required for connections.
+        Returns the uuids of the created nodes or connections in row order:
+
+        ```
+        uuids = model.from_columns(Person, {"name": names, "age": ages})
+        model.from_columns(Knows, {"node_a": uuids[:-1], "node_b": uuids[1:]}, endpoints=(Person, Person))
+        ```
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        template = template_of(cls)
+        connection = isinstance(cls, MetaConnection)
+        lists, count = column_lists(columns)
+        unknown = (
+            lists.keys()
+            - set(template.property_names)
+            - {"uuid", *(("node_a", "node_b") if connection else ())}
+        )
+        if unknown:
+            raise ValueError(
+                f"{cls.__name__} has no properties {', '.join(sorted(unknown))}"
+            )
+        uuids = lists.pop("uuid", None) or [uuid7str() for _ in range(count)]
+        if connection:
+            if "node_a" not in lists or "node_b" not in lists:
+                raise ValueError(
+                    "connections need the uuids of their nodes in columns node_a and node_b"
+                )
+            if endpoints is None:
+                # without labels, the end nodes could only be matched by scanning all nodes
+                raise ValueError(
+                    "connections need the classes of their nodes in endpoints, e.g. endpoints=(Person, Person)"
+                )
+            ends = lists.pop("node_a"), lists.pop("node_b")
+            query = template.unwind_create_query(
+                *(frozenset(x.labels) for x in endpoints)
+            )
+        else:
+            query = template.unwind_create_query()
+            ends = None
+        kind = "create_connection" if connection else "create_node"
+        try:
+            with self.session() as session:
+                for start in range(0, count, batch_size):
+                    end = start + batch_size
+                    batch = Batch(
+                        kind,
+                        query,
+                        _column_rows(lists, uuids, start, end, ends),
+                        uuids[start:end],
                     )
-                    try:
-                        raw_node = results.fetch(1)[0]["a"]
-                        results.consume()
-                    except IndexError:
-                        return None
-                    node = self.resolve_node(raw_node)
-                    print(f"read {node}")
-                    return node
-
-    def get_connection_by_uuid(self, uuid: str):
-        """
-        queries database for the connection by uuid
-        """
-        with n4.GraphDatabase.driver(self.uri, auth=self.auth) as driver:
-            driver.verify_connectivity()
-            with driver.session(database=self.data_base_name) as session:
-                with session.begin_transaction() as tx:
-                    results: n4.Result = tx.run(
-                        """
-                        MATCH (a)-[c {uuid: $uuid}]->(b)
-                        RETURN c, a, b
-                        """,
-                        uuid=uuid,
+                    session.execute_write(
+                        lambda tx: batch.run(self._instrument(tx, "from_columns"))
                     )
-                    try:
-                        res: n4.Result = results.fetch(1)[0]
-                        raw_connection = res["c"]
-                        results.consume()
-                    except IndexError:
-                        return None
-                    connection = self.resolve_connection(raw_connection)
-                    print(f"read {connection}")
-                    return connection
+        finally:
+            if self.query_cache is not None:
+                if connection:
+                    self.query_cache.invalidate(types=[cls.type])
+                else:
+                    self.query_cache.invalidate(labels=cls.labels)
+        return uuids
 
-    def read(self, query: str, **kwargs):
+    @contextmanager
+    def _flushing(self, graph: Graph, operation: str):
+        """
+        bookkeeping around writing the changes of `graph`:
+        cached objects of all touched uuids are invalidated (even if the write fails, as the objects
+        may have been modified in memory) and cached query results depending on them are dropped,
+        the change set is cleared once the write succeeded,
+        the snapshots of all written objects are updated and a `FlushEvent` is emitted if the model is instrumented
+        """
+        changes = list(graph.changes)
+        touched = [change.uuid for change in changes]
+        if self.query_cache is not None:
+            # labels removed by the changes are only known before they are written
+            labels, types = _footprint(changes)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if error is None:
+                graph.changes.clear()
+            # after a failed parallel flush, the committed changes are those already discarded
+            for change in changes:
+                if change.uuid not in graph.changes:
+                    change.persisted()
+            if self.object_cache is not None:
+                self.object_cache.invalidate(touched)
+            if self.query_cache is not None:
+                self.query_cache.invalidate(touched, labels, types)
+            if self.instrumentation is not None:
+                self.instrumentation.emit(
+                    FlushEvent(
+                        operation, len(touched), time.perf_counter() - start, error
+                    )
+                )
+
+    def _instrument(self, tx, operation: str):
         """
-        query the db and resolve objects
+        wraps `tx` (a transaction or session) so its statements emit `StatementEvent`s
+        if the model is instrumented; otherwise `tx` is returned as is
         """
-        # TODO implement proxy result that resolves objects
-        with n4.GraphDatabase.driver(self.uri, auth=self.auth) as driver:
-            driver.verify_connectivity()
-            with driver.session(database=self.data_base_name) as session:
+        if self.instrumentation is None:
+            return tx
+        return self.instrumentation.transaction(tx, operation)
+
+    def metrics(self) -> dict:
+        """
+        aggregated metrics of the model's instrumentation and object cache
+        """
+        metrics = {}
+        if self.instrumentation is not None:
+            metrics.update(self.instrumentation.metrics.snapshot())
+        if self.object_cache is not None:
+            metrics["object_cache"] = self.object_cache.stats()
+        if self.query_cache is not None:
+            metrics["query_cache"] = self.query_cache.stats()
+        return metrics
+
+    def _read(
+        self,
+        operation: str,
+        query: str,
+        params: dict,
+        fetch: Callable[[n4.Result], object],
+        depends: Callable[[object], Dependencies],
+    ):
+        """
+        runs a read statement and returns `fetch(result)`.
+        With a query cache, the value is read through the cache and stored along with the
+        uuids, labels and connection types it depends on, as returned by `depends(value)`.
+        """
+        cache = self.query_cache
+        if cache is not None:
+            key = QueryCache.key(query, params)
+            value = cache.get(key)
+            if value is not None:
+                return value
+            generation = cache.generation
+        with self.session() as session:
+            with session.begin_transaction() as tx:
+                tx = self._instrument(tx, operation)
+                value = fetch(tx.run(query, **params))
+        if cache is not None:
+            cache.put(key, value, *depends(value), generation=generation)
+        return value
+
+    def get_node_by_uuid(self, uuid: str, cls: Optional[MetaNode] = None):
+        """
+        queries database for the node by uuid.
+        The node is matched by the labels of `cls` if given, otherwise by any label of the registered classes
+        (nodes without a registered label are only found with `cls=GenericNode`, by a scan)
+        """
+        node = self._cached_node(uuid, cls)
+        if node is not None:
+            return node
+        records = self._read(
+            "get_node_by_uuid",
+            self._node_query(cls),
+            {"uuid": uuid},
+            _fetch_one,
+            lambda records: ([uuid], (), ()),
+        )
+        if not records:
+            return None
+        return self.resolve_node(records[0]["a"])
+
+    def get_connection_by_uuid(self, uuid: str, cls: Optional[MetaConnection] = None):
+        """
+        queries database for the connection by uuid.
+        The connection is matched by the type of `cls` if given, otherwise by any registered type
+        """
+        records = self._read(
+            "get_connection_by_uuid",
+            self._connection_query(cls),
+            {"uuid": uuid},
+            _fetch_one,
+            lambda records: (_connection_uuids(uuid, records), (), ()),
+        )
+        if not records:
+            return None
+        return self.resolve_connection(records[0]["c"])
+
+    def get_nodes_by_uuids(
+        self,
+        uuids: Iterable[str],
+        cls: Optional[MetaNode] = None,
+        chunk_size: int = 1000,
+        use_cache: bool = True,
+    ) -> Lookup:
+        """
+        queries database for all nodes in `uuids` with one `UNWIND` statement per `chunk_size` uuids,
+        all in one transaction; nodes are matched as in `get_node_by_uuid`.
+        If the model has an object cache and `use_cache` is set, only uuids missing in the cache are queried.
+        Returns the nodes found by uuid and the uuids not found:
+
+        ```
+        lookup = model.get_nodes_by_uuids(uuids)
+        nodes = [lookup.found[x] for x in uuids if x not in lookup.missing]
+        ```
+        """
+        uuids = _unique(uuids)
+        found, pending = self._cached_nodes(uuids, use_cache, cls)
+        if pending:
+            query = self._node_query(cls, unwind=True)
+            with self.session() as session:
+                with session.begin_transaction() as tx:
+                    tx = self._instrument(tx, "get_nodes_by_uuids")
+                    for chunk in _chunks(pending, chunk_size):
+                        for record in tx.run(query, uuids=chunk):
+                            node = self.resolve_node(record["a"])
+                            found[node.uuid] = node
+        return _lookup(uuids, found)
+
+    def get_connections_by_uuids(
+        self,
+        uuids: Iterable[str],
+        cls: Optional[MetaConnection] = None,
+        chunk_size: int = 1000,
+    ) -> Lookup:
+        """
+        queries database for all connections in `uuids` with one `UNWIND` statement per `chunk_size` uuids,
+        all in one transaction; connections are matched as in `get_connection_by_uuid`.
+        Returns the connections found by uuid and the uuids not found.
+        """
+        uuids = _unique(uuids)
+        found = {}
+        if uuids:
+            query = self._connection_query(cls, unwind=True)
+            with self.session() as session:
                 with session.begin_transaction() as tx:
-                    results: n4.Result = tx.run(query, **kwargs)
-                    try:
-                        # res: n4.Result = results.fetch(1)[0]
-                        graph = Graph(self, raw_graph=results.graph())
-                    except IndexError:
-                        return None
-                    return graph
+                    tx = self._instrument(tx, "get_connections_by_uuids")
+                    for chunk in _chunks(uuids, chunk_size):
+                        for record in tx.run(query, uuids=chunk):
+                            connection = self.resolve_connection(record["c"])
+                            found[connection.uuid] = connection
+        return _lookup(uuids, found)
+
+    def _cached_nodes(
+        self,
+        uuids: List[str],
+        use_cache: bool,
+        cls: Optional[MetaNode] = None,
+        identity_map: Optional[dict] = None,
+    ) -> Tuple[Dict[str, Node], List[str]]:
+        """
+        splits `uuids` into the nodes found in the object cache (see `_cached_node`) and the uuids to query
+        """
+        if self.object_cache is None or not use_cache:
+            return {}, list(uuids)
+        found, pending = {}, []
+        for uuid in uuids:
+            node = self._cached_node(uuid, cls, identity_map)
+            if node is None:
+                pending.append(uuid)
+            else:
+                found[uuid] = node
+        return found, pending
+
+    def read(self, query: str, **kwargs):
+        """
+        query the db and resolve objects.
+        With a query cache, the result is invalidated by writes to any entity it contains and to any label
+        or connection type named in `query` (by any write, if `query` names none);
+        a node pattern without a label depends on all labels, a relationship pattern without a type on all types
+        """
+        raw_graph = self._read(
+            "read",
+            query,
+            kwargs,
+            _fetch_graph,
+            lambda raw_graph: _graph_dependencies(raw_graph, *_query_names(query)),
+        )
+        return Graph(self, raw_graph=raw_graph)
 
     def read_subgraph(
-        self, base_node: Node, with_conns: Set[Connection] = None, max_depth=1
+        self,
+        base_node: Node,
+        with_conns: Set[Connection] = None,
+        max_depth=1,
+        compact: bool = False,
     ) -> Graph:
         """
         Returns a subgraph as JSON.
-        The subgraph consists of the `base_node` and all nodes, that are reachable within `max_depth` hops via any connections in `with_conns`
+        The subgraph consists of the `base_node` and all nodes, that are reachable within `max_depth` hops via any connections in `with_conns`.
+        With `compact`, the nodes are kept in the graph's node tables, see `Graph`.
+        With a query cache, the result is invalidated by writes to its entities and to connections of `with_conns`.
         """
 
-        with_conns = {} if with_conns is None else with_conns
+        raw_graph = self._read(
+            "read_subgraph",
+            _subgraph_query(type(base_node).labels, with_conns, max_depth),
+            {"uuid": base_node.uuid},
+            _fetch_graph,
+            lambda raw_graph: _graph_dependencies(
+                raw_graph, (), connection_types(with_conns), [base_node.uuid]
+            ),
+        )
+        return Graph(self, raw_graph=raw_graph, compact=compact)
 
-        with n4.GraphDatabase.driver(self.uri, auth=self.auth) as driver:
-            driver.verify_connectivity()
-            with driver.session(database=self.data_base_name) as session:
-                with session.begin_transaction() as tx:
-                    results: n4.Result = tx.run(
-                        f"""
-                        MATCH (a {{uuid: $uuid}})-[c:{"|".join({x.type for x in with_conns})}]-{{1,{max_depth}}}(b)
-                        RETURN a, c, b
-                        """,
-                        uuid=base_node.uuid,
-                    )
-                    try:
-                        # res: n4.Result = results.fetch(1)[0]
-                        graph = Graph(self, raw_graph=results.graph())
-                    except IndexError:
-                        return None
-                    return graph
+    def read_subgraph_lazy(
+        self,
+        base_node: Node,
+        with_conns: Set[Connection] = None,
+        prefetch_depth: int = 1,
+        fan_out: Optional[int] = None,
+    ) -> LazyGraph:
+        """
+        Returns a `LazyGraph` around `base_node` that fetches further hops via `with_conns` as it is traversed.
+        The first `prefetch_depth` hops are fetched eagerly, one query per hop for its whole frontier;
+        at most `fan_out` connections are fetched per node and hop.
+        Unlike `read_subgraph`, which matches paths, every hop only returns distinct connections.
+        """
+        graph = LazyGraph(self, with_conns, fan_out)
+        graph.add_node(base_node)
+        frontier = [base_node]
+        for _ in range(prefetch_depth):
+            frontier = graph.expand(frontier)
+            if not frontier:
+                break
+        return graph
 
-    def resolve_connection(self, raw_connection: n4_graph.Relationship):
+    def scan(
+        self,
+        cls: MetaNode | MetaConnection,
+        since: Optional[datetime | float] = None,
+        until: Optional[datetime | float] = None,
+        after: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> Iterator[Node | Connection]:
         """
-        converts a "raw" neo4j Relationship to an `ogr.Connection`
+        iterates all nodes (with the labels) or connections (of the type) of a registered class in uuid order,
+        one page of `page_size` entities per query (`WHERE x.uuid > $after ORDER BY x.uuid LIMIT $page_size`),
+        each read in a transaction of its own and resolved through the model.
+        As uuids are uuid7s (see `Graph.create_node`), uuid order is creation order; `since` and `until`
+        (datetimes or unix timestamps) restrict the scan to entities created in `[since, until)`,
+        and `after` resumes a scan after the last uuid seen:
+
+        ```
+        for node in model.scan(ExampleNode, since=last_sync):
+            ...
+        ```
         """
-        self.type_connections_lut[raw_connection.type](
-            node_a=self.resolve_node(raw_connection.start_node),
-            node_b=self.resolve_node(raw_connection.end_node),
-            **raw_connection._properties,
+        if page_size < 1:
+            raise ValueError(f"page_size must be positive, got {page_size}")
+        query = _scan_query(cls, until is not None)
+        params = {"page_size": page_size}
+        if until is not None:
+            params["before"] = _uuid7_bound(until)
+        last = max(after or "", "" if since is None else _uuid7_bound(since))
+        resolve = (
+            self.resolve_connection
+            if isinstance(cls, MetaConnection)
+            else self.resolve_node
         )
+        while True:
+            with self.session() as session:
+                with session.begin_transaction() as tx:
+                    tx = self._instrument(tx, "scan")
+                    page = [
+                        resolve(record["x"])
+                        for record in tx.run(query, after=last, **params)
+                    ]
+            yield from page
+            if len(page) < page_size:
+                return
+            last = page[-1].uuid
 
-    def resolve_node(self, raw_node: n4_graph.Node):
+    def resolve_connection(
+        self, raw_connection: n4_graph.Relationship, identity_map: Optional[dict] = None
+    ):
         """
-        converts a "raw" neo4j Node to an `ogr.Node`
+        converts a "raw" neo4j Relationship to an `ogr.Connection`.
+        Objects already in `identity_map` (uuid: object) are reused and newly resolved ones are added to it;
+        by default the identity map of the current `session` is used.
         """
-        node_type, dyn_labels = self._infer_node_type(raw_node.labels)
-        node = node_type(dyn_labels=dyn_labels, **raw_node._properties)
+        identity_map = self._identity_map(identity_map)
+        key = _identity_key(raw_connection)
+        connection = identity_map.get(key)
+        if connection is None:
+            connection = self.type_connections_lut[raw_connection.type](
+                node_a=self.resolve_node(raw_connection.start_node, identity_map),
+                node_b=self.resolve_node(raw_connection.end_node, identity_map),
+                **raw_connection._properties,
+            )
+            template_of(type(connection)).snapshot(connection)
+            identity_map[key] = connection
+        return connection
+
+    def resolve_node(
+        self, raw_node: n4_graph.Node, identity_map: Optional[dict] = None
+    ):
+        """
+        converts a "raw" neo4j Node to an `ogr.Node`.
+        Objects already in `identity_map` (uuid: object) are reused and newly resolved ones are added to it;
+        by default the identity map of the current `session` is used.
+        """
+        identity_map = self._identity_map(identity_map)
+        key = _identity_key(raw_node)
+        node = identity_map.get(key)
+        if node is None:
+            node = self._build_node(raw_node.labels, dict(raw_node._properties))
+            identity_map[key] = node
+            if self.object_cache is not None and node.uuid is not None:
+                self.object_cache.put(node.uuid, raw_node.labels, raw_node._properties)
         return node
 
+    def _build_node(self, labels: frozenset, properties: dict) -> Node:
+        """
+        a new, persisted node of the class inferred from `labels`
+        """
+        node_type, dyn_labels = self._infer_node_type(labels)
+        if node_type is GenericNode:
+            node = GenericNode(
+                uuid=properties.pop("uuid", None),
+                dyn_labels=dyn_labels,
+                properties=properties,
+            )
+        else:
+            node = node_type(dyn_labels=dyn_labels, **properties)
+        template_of(type(node)).snapshot(node)
+        return node
+
+    def _cached_node(
+        self,
+        uuid: str,
+        cls: Optional[MetaNode] = None,
+        identity_map: Optional[dict] = None,
+    ) -> Optional[Node]:
+        """
+        the node `uuid` from the object cache, if cached with the labels of `cls`.
+        A node already in `identity_map` (by default the one of the current `session`) is reused,
+        otherwise a fresh object is built from the cached data and added to it
+        """
+        if self.object_cache is None:
+            return None
+        identity_map = self._identity_map(identity_map)
+        cached = self.object_cache.get(uuid)
+        if cached is None:
+            return None
+        labels, properties = cached
+        if cls is not None and not cls.labels <= labels:
+            return None
+        node = identity_map.get(uuid)
+        if node is None:
+            node = identity_map[uuid] = self._build_node(labels, properties)
+        return node
+
+    def _node_query(self, cls: Optional[MetaNode], unwind: bool = False) -> str:
+        if cls is not None:
+            return _node_by_uuid_query([cls.labels], unwind)
+        query = self._node_by_uuid.get(unwind)
+        if query is None:
+            query = self._node_by_uuid[unwind] = _node_by_uuid_query(
+                [x.labels for x in self.registered_nodes], unwind
+            )
+        return query
+
+    def _connection_query(
+        self, cls: Optional[MetaConnection], unwind: bool = False
+    ) -> str:
+        if cls is not None:
+            return _connection_by_uuid_query([cls.type], unwind)
+        query = self._connection_by_uuid.get(unwind)
+        if query is None:
+            query = self._connection_by_uuid[unwind] = _connection_by_uuid_query(
+                [x.type for x in self.registered_connections], unwind
+            )
+        return query
+
+    def _identity_map(self, identity_map: Optional[dict]) -> dict:
+        if identity_map is not None:
+            return identity_map
+        session_identity_map = getattr(self._local, "identity_map", None)
+        return session_identity_map if session_identity_map is not None else {}
+
     def _infer_node_type(self, labels: frozenset) -> (MetaNode, frozenset):
         """
-        infers type with maximum label intersection
+        infers type with maximum label intersection.
+        Ties are broken in favour of the class with fewer labels missing on the node, then by registration order.
+        If no registered class shares a label with the node, `GenericNode` is used.
+        Results are memoised per label combination.
         """
-        # TODO implement basic ogr.Node as fallback
+        labels = labels if isinstance(labels, frozenset) else frozenset(labels)
+        memo = self._node_type_memo.get(labels)
+        if memo is not None:
+            return memo
 
-        label_lut_sets = list(self.label_nodes_lut.keys())
-        length_set_map = {
-            lambda x: len(labels.intersection(x)): x for x in label_lut_sets
-        }
-        node_type = self.label_nodes_lut[length_set_map[max(length_set_map.keys())]]
-        residual = labels.difference(node_type.labels)
-        return node_type, residual
-
-    def query(self, query: str, *args, **kwargs):
-        with n4.GraphDatabase.driver(self.uri, auth=self.auth) as driver:
-            driver.verify_connectivity()
-            with driver.session(database=self.data_base_name) as session:
-                with session.begin_transaction() as tx:
-                    results: Result = Result(tx.run(query, *args, **kwargs))
-                    return results
+        scores: Dict[MetaNode, int] = {}
+        for label in labels:
+            for cls in self._label_index.get(label, ()):
+                scores[cls] = scores.get(cls, 0) + 1
+        if scores:
+            rank = self._node_rank
+            node_type = max(
+                scores,
+                key=lambda cls: (
+                    scores[cls],
+                    scores[cls] - len(cls.labels),
+                    -rank[cls],
+                ),
+            )
+        else:
+            node_type = GenericNode
+        memo = node_type, labels.difference(node_type.labels)
+        if len(self._node_type_memo) >= _NODE_TYPE_MEMO_SIZE:
+            self._node_type_memo.clear()
+        self._node_type_memo[labels] = memo
+        return memo
+
+    def query(self, query: str, *args, fetch_size: int = 1000, **kwargs) -> Result:
+        """
+        runs `query` and returns a `Result` streaming its resolved records.
+        Records are pulled from the database in chunks of `fetch_size` while the result is iterated.
+        Unless the call happens within `session`, the result owns a session of its own,
+        which stays open until the result is exhausted or closed.
+        Within `session`, the query runs in the bound session and `fetch_size` is ignored;
+        pass it to `session` instead, e.g. `model.session(fetch_size=100)`:
+
+        ```
+        with model.query("MATCH (n:ExampleNode) RETURN n") as result:
+            for record in result:
+                ...
+        ```
+        """
+        bound = getattr(self._local, "session", None)
+        if bound is not None:
+            bound = self._instrument(bound, "query")
+            return Result(self, bound.run(query, *args, **kwargs))
+        if self.driver is None:
+            self.open()
+        session = self.driver.session(
+            database=self.data_base_name, fetch_size=fetch_size
+        )
+        try:
+            n4_result = self._instrument(session, "query").run(query, *args, **kwargs)
+        except BaseException:
+            session.close()
+            raise
+        return Result(self, n4_result, on_close=session.close)
+
+
+_NODE_TYPE_MEMO_SIZE = 4096
+
+# `:Label`, `:TYPE` and `|TYPE` in a query; over-matching (e.g. map keys) only invalidates more often
+_NAME = re.compile(r"[:|]\s*`?(\w+)")
+# node patterns without a label, e.g. `(a)`, `()` or `(a {name: $name})`, but not calls like `count(a)`
+_UNLABELLED_NODE = re.compile(r"(?<![\w`])\(\s*\w*\s*(\{[^}]*\})?\s*\)")
+# relationship patterns without a type, e.g. `-[r]->`, `-[*1..3]-` or `-->`
+_UNTYPED_RELATIONSHIP = re.compile(r"-\[[^\]:]*\]-|\)\s*<?-->?\s*\(")
+
+
+def _column_rows(
+    lists: Dict[str, list],
+    uuids: List[str],
+    start: int,
+    end: int,
+    ends: Optional[Tuple[list, list]],
+) -> List[dict]:
+    """
+    the `UNWIND` rows `start` to `end` of the property columns `lists`: the uuid and properties of nodes
+    or, given the uuids of the connected nodes `ends`, `uuid_a`, `uuid_b` and `props` of connections
+    """
+    names = list(lists)
+    columns = [x[start:end] for x in lists.values()]
+    rows = [
+        {**dict(zip(names, values)), "uuid": uuid}
+        for uuid, *values in zip(uuids[start:end], *columns)
+    ]
+    if ends is None:
+        return rows
+    return [
+        {"uuid_a": a, "uuid_b": b, "props": props}
+        for a, b, props in zip(ends[0][start:end], ends[1][start:end], rows)
+    ]
+
+
+def _fetch_one(results: n4.Result) -> list:
+    records = results.fetch(1)
+    results.consume()
+    return records
+
+
+def _fetch_graph(results: n4.Result) -> n4_graph.Graph:
+    return results.graph()
+
+
+def _query_names(query: str) -> Tuple[Optional[Set[str]], Optional[Set[str]]]:
+    """
+    the labels and types a query may match: all names it mentions, or any if it mentions none
+    or computes them (`$(...)`); any labels if it has a node pattern without a label
+    and any types if it has a relationship pattern without a type
+    """
+    names = set(_NAME.findall(query))
+    if not names or "$(" in query:
+        return None, None
+    labels = None if _UNLABELLED_NODE.search(query) else names
+    types = None if _UNTYPED_RELATIONSHIP.search(query) else names
+    return labels, types
+
+
+def _connection_uuids(uuid: str, records: list) -> List[str]:
+    """
+    the uuids a connection lookup depends on: the connection and, if found, its end nodes `a` and `b`
+    (deleting either detaches the connection)
+    """
+    if not records:
+        return [uuid]
+    return [uuid, _identity_key(records[0]["a"]), _identity_key(records[0]["b"])]
+
+
+def _graph_dependencies(
+    raw_graph: n4_graph.Graph,
+    labels: Optional[Iterable[str]],
+    types: Optional[Iterable[str]],
+    uuids: Iterable[str] = (),
+) -> Dependencies:
+    """
+    the dependencies of a read returning `raw_graph`: the uuids of its entities (including the endpoints of
+    its relationships, whose deletion detaches them) and `labels` and `types` plus those in the graph
+    """
+    uuids = set(uuids)
+    found_labels, found_types = set(), set()
+    for raw_node in raw_graph.nodes:
+        uuids.add(_identity_key(raw_node))
+        found_labels.update(raw_node.labels)
+    for raw_connection in raw_graph.relationships:
+        uuids.add(_identity_key(raw_connection))
+        uuids.add(_identity_key(raw_connection.start_node))
+        uuids.add(_identity_key(raw_connection.end_node))
+        found_types.add(raw_connection.type)
+    return (
+        uuids,
+        None if labels is None else found_labels.union(labels),
+        None if types is None else found_types.union(types),
+    )
+
+
+def _footprint(changes: Iterable[Change]) -> Tuple[Set[str], Set[str]]:
+    """
+    the labels (including dynamic labels being removed) and connection types written by `changes`
+    """
+    labels, types = set(), set()
+    for change in changes:
+        target = change.target
+        if change.entity == "node":
+            labels.update(target.labels, target.dyn_labels)
+            labels.update(template_of(type(target)).diff(target)[2])
+        else:
+            types.add(target.type)
+    return labels, types
+
+
+def _node_by_uuid_query(label_sets: Iterable[FrozenSet[str]], unwind: bool) -> str:
+    """
+    query matching a node `a` by `$uuid` (or, if `unwind`, every node in `$uuids`)
+    as a `UNION` of index seeks, one per label in `label_sets`.
+    Without labels, nodes can only be found by scanning all nodes.
+    """
+    labels = sorted({label for x in label_sets for label in x})
+    return "UNION".join(
+        f"""
+            {_UNWIND_UUIDS if unwind else ""}
+            MATCH (a{f":{label}" if label else ""} {{uuid: {_uuid(unwind)}}})
+            RETURN a
+            """
+        for label in labels or [None]
+    )
+
+
+def _connection_by_uuid_query(types: Iterable[str], unwind: bool) -> str:
+    """
+    query matching a connection `c` from `a` to `b` by `$uuid` (or, if `unwind`, every connection in `$uuids`)
+    as a `UNION` of index seeks, one per type in `types`
+    """
+    types = sorted(set(types))
+    return "UNION".join(
+        f"""
+            {_UNWIND_UUIDS if unwind else ""}
+            MATCH (a)-[c{f":{type}" if type else ""} {{uuid: {_uuid(unwind)}}}]->(b)
+            RETURN c, a, b
+            """
+        for type in types or [None]
+    )
+
+
+def _scan_query(cls: MetaNode | MetaConnection, bounded: bool) -> str:
+    """
+    query returning a page of entities `x` of `cls` in uuid order after `$after` (and before `$before`)
+    """
+    if isinstance(cls, MetaConnection):
+        # endpoints are returned as well, so the connection is resolved with them
+        match, returns = f"MATCH (a)-[x:{cls.type}]->(b)", "x, a, b"
+    else:
+        match, returns = f"MATCH (x{_labels(cls.labels)})", "x"
+    return f"""
+        {match}
+        WHERE x.uuid > $after {"AND x.uuid < $before" if bounded else ""}
+        RETURN {returns}
+        ORDER BY x.uuid
+        LIMIT $page_size
+        """
+
+
+def _uuid7_bound(moment: datetime | float) -> str:
+    """
+    a string sorting before all uuid7s created at or after `moment` and after all created before it:
+    the timestamp (36 bits of seconds, 24 bits of fractions and the version, as encoded by `uuid7`)
+    uuid7s start with, followed by zeros in place of the counter and random bits
+    """
+    if isinstance(moment, datetime):
+        moment = moment.timestamp()
+    prefix = uuid7(ns=max(0, round(moment * 1e9)), as_type="bytes")[:8].hex()
+    return f"{prefix[:8]}-{prefix[8:12]}-{prefix[12:]}-0000-000000000000"
+
+
+_UNWIND_UUIDS = "UNWIND $uuids AS uuid"
+
+
+def _uuid(unwind: bool) -> str:
+    return "uuid" if unwind else "$uuid"
+
+
+def _unique(uuids: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(uuids))
+
+
+def _chunks(items: List[str], chunk_size: int) -> Iterator[List[str]]:
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    for i in range(0, len(items), chunk_size):
+        yield items[i : i + chunk_size]
+
+
+def _lookup(uuids: List[str], found: dict) -> Lookup:
+    """
+    orders the `found` objects as requested and collects the missing uuids
+    """
+    return Lookup(
+        found={x: found[x] for x in uuids if x in found},
+        missing=[x for x in uuids if x not in found],
+    )
+
+
+def _subgraph_query(
+    labels: FrozenSet[str], with_conns: Optional[Set[Connection]], max_depth: int
+) -> str:
+    with_conns = {} if with_conns is None else with_conns
+    return f"""
+        MATCH (a{_labels(labels)} {{uuid: $uuid}})-[c:{"|".join({x.type for x in with_conns})}]-{{1,{max_depth}}}(b)
+        RETURN a, c, b
+        """
@@ -1,10 +1,22 @@
 from __future__ import annotations
 import attrs
-from typing import Set, List, TYPE_CHECKING
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, List, TYPE_CHECKING
 from ogr.connection import Connection
 
 if TYPE_CHECKING:
     from ogr.connection import MetaConnection
+    from ogr.graph import Graph
+
+
+_label_sets: Dict[FrozenSet[str], FrozenSet[str]] = {}
+
+
+def intern_labels(labels: Iterable[str]) -> FrozenSet[str]:
+    """
+    returns the one shared frozenset of a label combination, so nodes with the same labels share it
+    """
+    labels = labels if isinstance(labels, frozenset) else frozenset(labels)
+    return _label_sets.setdefault(labels, labels)
 
 
 class MetaNode(type):
@@ -17,35 +29,42 @@ class MetaNode(type):
 @attrs.define(kw_only=True)
 class Node:
     uuid: str | None = attrs.field(default=None)
-    dyn_labels: Set[str] = attrs.field(factory=set)
+    # shared between nodes with the same labels (see `intern_labels`); the label methods replace it
+    dyn_labels: FrozenSet[str] = attrs.field(default=frozenset())
+    # state last written to or read from the database, see `ogr.template.NodeTemplate.snapshot`
+    _persisted: tuple | None = attrs.field(
+        default=None, init=False, eq=False, repr=False
+    )
 
     def add_labels(self, labels: Set[str]):
         """
         Add dynamic (object-specific) labels to a node.
         The node's class label is handled seperately.
         """
-        self.dyn_labels = self.dyn_labels.union(labels)
+        self.dyn_labels = intern_labels(self.dyn_labels.union(labels))
 
     def add_label(self, label: str):
         """
         Add a dynamic (object-specific) label to a node.
         The node's class label is handled seperately.
         """
-        self.dyn_labels.add(label)
+        self.dyn_labels = intern_labels(self.dyn_labels.union((label,)))
 
     def remove_labels(self, labels: List[str]):
         """
         Remove dynamic (object-specific) labels from a node.
         The node's class label is handled seperately.
         """
-        self.dyn_labels.difference_update(labels)
+        self.dyn_labels = intern_labels(self.dyn_labels.difference(labels))
 
     def remove_label(self, label: str):
         """
         Remove a dynamic (object-specific) label from a node.
         The node's class label is handled seperately.
         """
-        self.dyn_labels.remove(label)
+        if label not in self.dyn_labels:
+            raise KeyError(label)
+        self.dyn_labels = intern_labels(self.dyn_labels.difference((label,)))
 
     def create(self, graph: Graph):
         """
@@ -65,6 +84,15 @@ class Node:
         """
         graph.delete_node(self)
 
+    def neighbors(
+        self, graph: Graph, direction: str = "both", types: Optional[Iterable] = None
+    ) -> List[Node]:
+        """
+        Returns the nodes connected to this node in `graph`, see `Graph.neighbors`.
+        In a `LazyGraph`, they are fetched from the database on first access.
+        """
+        return graph.neighbors(self, direction, types)
+
     def connect_to(self, node_end: Node, connection_type: MetaConnection = Connection):
         """
         Connects this node with `node_end`.
@@ -84,3 +112,15 @@ class Node:
         :connection_type: `MetaConnection`, default is the plain `Connection` class
         """
         connection_type(node_a=node_start, node_b=self)
+
+
+@attrs.define(kw_only=True)
+class GenericNode(Node):
+    """
+    Fallback for nodes whose labels match no registered class.
+    All labels are kept as dynamic labels and all properties in `properties`.
+    """
+
+    labels = frozenset()
+
+    properties: Dict[str, Any] = attrs.field(factory=dict)
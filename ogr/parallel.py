@@ -0,0 +1,91 @@
+from __future__ import annotations
+import attrs
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from ogr.batch import Batch, plan_batches
+from ogr.graph import Graph
+
+# phases of a parallel flush; chunks within a phase are independent and committed concurrently,
+# a phase only starts once all chunks of the previous phase are committed
+PARALLEL_PHASES: Tuple[Tuple[str, ...], ...] = (
+    ("create_node", "set_node"),
+    ("create_connection", "set_connection"),
+    ("delete_connection",),
+    ("delete_node",),
+)
+
+
+@attrs.define
+class ChunkFailure:
+    phase: int
+    batch: Batch
+    error: BaseException
+
+
+@attrs.define
+class FlushReport:
+    """
+    Outcome of a parallel (or resumable, see `ogr.resumable`) flush: the committed and failed chunks
+    and the chunks that were skipped because an earlier chunk failed.
+    """
+
+    committed: List[Batch] = attrs.field(factory=list)
+    failed: List[ChunkFailure] = attrs.field(factory=list)
+    skipped: List[Batch] = attrs.field(factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+class ParallelFlushError(Exception):
+    """
+    Raised if chunks of a parallel flush failed; `report` tells which chunks were committed.
+    """
+
+    def __init__(self, report: FlushReport):
+        self.report = report
+        failures = ", ".join(
+            f"{x.batch.kind} ({len(x.batch.rows)} rows, phase {x.phase}): {x.error!r}"
+            for x in report.failed
+        )
+        super().__init__(f"{len(report.failed)} chunk(s) failed: {failures}")
+
+
+def write_parallel(
+    model, graph: Graph, workers: int = 4, batch_size: int = 1000
+) -> FlushReport:
+    """
+    commits the changes of `graph` as independent chunks of at most `batch_size` rows,
+    each in a transaction of its own, from a pool of `workers` threads with a session each.
+    The changes of committed chunks are removed from the change set as soon as their phase completes,
+    so after a failure the remaining changes can simply be flushed again.
+    """
+    phase_of = {
+        kind: phase for phase, kinds in enumerate(PARALLEL_PHASES) for kind in kinds
+    }
+    phases: List[List[Batch]] = [[] for _ in PARALLEL_PHASES]
+    for batch in plan_batches(graph.changes, batch_size):
+        phases[phase_of[batch.kind]].append(batch)
+
+    def commit(batch: Batch):
+        with model.session() as session:
+            session.execute_write(
+                lambda tx: batch.run(model._instrument(tx, "write_graph_parallel"))
+            )
+
+    report = FlushReport()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for phase, batches in enumerate(phases):
+            if not report.ok:
+                report.skipped.extend(batches)
+                continue
+            futures = [(batch, executor.submit(commit, batch)) for batch in batches]
+            for batch, future in futures:
+                error = future.exception()
+                if error is None:
+                    report.committed.append(batch)
+                    graph.changes.discard(batch.uuids)
+                else:
+                    report.failed.append(ChunkFailure(phase, batch, error))
+    return report
@@ -1,23 +1,174 @@
 from __future__ import annotations
+import attrs
 import neo4j as n4
+import neo4j.graph as n4_graph
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
 
 from ogr.graph import Graph
 
 
+@attrs.define
+class Lookup:
+    """
+    Outcome of a multi-get: the objects `found` by uuid (in the order requested) and the `missing` uuids.
+    """
+
+    found: Dict[str, object] = attrs.field(factory=dict)
+    missing: List[str] = attrs.field(factory=list)
+
+
 class Result:
-    def __init__(self, n4_result: n4.Result):
+    """
+    A lazily resolving stream of records.
+    Records are pulled from the database as the result is iterated (in chunks of the session's `fetch_size`),
+    and nodes and connections in them are resolved through the model on demand, one record at a time.
+    The session the result was opened in stays open until the result is exhausted or closed.
+    """
+
+    def __init__(
+        self,
+        model,
+        n4_result: n4.Result,
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        self.model = model
         self.n4_result = n4_result
+        self._records: Iterator[n4.Record] = iter(n4_result)
+        self._on_close = on_close
+        self.closed = False
+
+    def __iter__(self) -> Result:
+        return self
+
+    def __next__(self) -> dict:
+        try:
+            record = next(self._records)
+        except StopIteration:
+            self.close()
+            raise
+        return _resolve_record(self.model, record)
+
+    def __enter__(self) -> Result:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        releases the session of the result; unread records are discarded
+        """
+        if not self.closed:
+            self.closed = True
+            if self._on_close is not None:
+                self._on_close()
 
-    def consume(self):
-        return self.n4_result.consume()
+    def consume(self) -> n4.ResultSummary:
+        try:
+            return self.n4_result.consume()
+        finally:
+            self.close()
 
-    def fetch(self, n: int):
+    def fetch(self, n: int) -> List[dict]:
         """
         get and return the next n items from the result stream
         """
-        raise NotImplementedError()
-        # TODO
-        return self.n4_result.fetch(n)
+        return list(islice(self, n))
 
     def graph(self) -> Graph:
-        return Graph(self.n4_result.graph)
+        """
+        materialises all remaining records as a `Graph`
+        """
+        try:
+            return Graph(self.model, raw_graph=self.n4_result.graph())
+        finally:
+            self.close()
+
+
+class AsyncResult:
+    """
+    The asyncio counterpart of `Result`: an async iterator over lazily resolved records.
+    """
+
+    def __init__(
+        self,
+        model,
+        n4_result: n4.AsyncResult,
+        on_close: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        self.model = model
+        self.n4_result = n4_result
+        self._on_close = on_close
+        self.closed = False
+
+    def __aiter__(self) -> AsyncResult:
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            record = await self.n4_result.__anext__()
+        except StopAsyncIteration:
+            await self.close()
+            raise
+        return _resolve_record(self.model, record)
+
+    async def __aenter__(self) -> AsyncResult:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        releases the session of the result; unread records are discarded
+        """
+        if not self.closed:
+            self.closed = True
+            if self._on_close is not None:
+                await self._on_close()
+
+    async def consume(self) -> n4.ResultSummary:
+        try:
+            return await self.n4_result.consume()
+        finally:
+            await self.close()
+
+    async def fetch(self, n: int) -> List[dict]:
+        """
+        get and return the next n items from the result stream
+        """
+        records = []
+        async for record in self:
+            records.append(record)
+            if len(records) >= n:
+                break
+        return records
+
+    async def graph(self) -> Graph:
+        """
+        materialises all remaining records as a `Graph`
+        """
+        try:
+            return Graph(self.model, raw_graph=await self.n4_result.graph())
+        finally:
+            await self.close()
+
+
+def _resolve_record(model, record: n4.Record) -> dict:
+    # identity map per record: objects within a record are shared, memory stays constant
+    identity_map = {}
+    return {key: _resolve(model, value, identity_map) for key, value in record.items()}
+
+
+def _resolve(model, value, identity_map: dict):
+    if isinstance(value, n4_graph.Node):
+        return model.resolve_node(value, identity_map)
+    if isinstance(value, n4_graph.Relationship):
+        return model.resolve_connection(value, identity_map)
+    if isinstance(value, n4_graph.Path):
+        # connections carry their end nodes, so a path is resolved to its connections
+        return [_resolve(model, x, identity_map) for x in value.relationships]
+    if isinstance(value, list):
+        return [_resolve(model, x, identity_map) for x in value]
+    return value
@@ -0,0 +1,110 @@
+from __future__ import annotations
+import attrs
+import time
+from typing import Callable, List
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+from ogr.batch import PHASES, Batch, plan_batches
+from ogr.graph import Graph
+from ogr.parallel import ChunkFailure, FlushReport
+
+# errors after which a chunk is retried: the transaction was rolled back and may succeed when repeated
+TRANSIENT_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+
+
+class ResumableFlushError(Exception):
+    """
+    Raised if a chunk of a resumable flush failed for good; `report` tells which chunks were committed.
+    """
+
+    def __init__(self, report: FlushReport):
+        self.report = report
+        failure = report.failed[0]
+        super().__init__(
+            f"{failure.batch.kind} chunk ({len(failure.batch.rows)} rows) failed after "
+            f"{len(report.committed)} committed chunk(s): {failure.error!r}"
+        )
+
+
+@attrs.define
+class ChunkSize:
+    """
+    The number of rows per chunk, adapted to the observed commit latency:
+    doubled while commits take less than half the `target_latency`, halved when they take longer
+    than `target_latency` or fail, always within `[minimum, maximum]`.
+    """
+
+    size: int = 1000
+    minimum: int = 1
+    maximum: int = 50_000
+    target_latency: float = 1.0
+
+    def __attrs_post_init__(self):
+        if not 1 <= self.minimum <= self.size <= self.maximum:
+            raise ValueError(
+                f"chunk sizes must satisfy 1 <= minimum <= size <= maximum, "
+                f"got {self.minimum}, {self.size}, {self.maximum}"
+            )
+
+    def committed(self, latency: float):
+        if latency > self.target_latency:
+            self.shrink()
+        elif latency < self.target_latency / 2:
+            self.size = min(self.maximum, self.size * 2)
+
+    def shrink(self):
+        self.size = max(self.minimum, self.size // 2)
+
+
+def write_resumable(
+    model,
+    graph: Graph,
+    chunk_size: ChunkSize,
+    max_retries: int = 5,
+    backoff: float = 0.5,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.perf_counter,
+) -> FlushReport:
+    """
+    commits the changes of `graph` in order (see `ogr.batch.PHASES`) as `UNWIND` chunks of `chunk_size` rows,
+    each in an explicit transaction of its own.
+    A chunk failing with a transient error is retried up to `max_retries` times with a smaller chunk size,
+    after waiting `backoff` seconds, doubled with every retry.
+    Explicit transactions are not retried by the driver (unlike `execute_write`), so this is the only retry loop.
+    The changes of every committed chunk are removed from the change set right away, so the change set is
+    the checkpoint: after a failure, flushing again resumes with the first chunk not committed.
+    """
+    report = FlushReport()
+    # one batch per group of changes sharing a statement, cut into chunks below
+    groups = plan_batches(graph.changes, batch_size=max(len(graph.changes), 1))
+    for index, group in enumerate(groups):
+        offset = retries = 0
+        while offset < len(group.rows):
+            end = offset + chunk_size.size
+            chunk = Batch(
+                group.kind, group.query, group.rows[offset:end], group.uuids[offset:end]
+            )
+            start = clock()
+            try:
+                with model.session() as session:
+                    with session.begin_transaction() as tx:
+                        chunk.run(model._instrument(tx, "write_graph_resumable"))
+            except Exception as e:
+                if isinstance(e, TRANSIENT_ERRORS) and retries < max_retries:
+                    sleep(backoff * 2**retries)
+                    retries += 1
+                    chunk_size.shrink()
+                    continue
+                report.failed.append(ChunkFailure(PHASES.index(group.kind), chunk, e))
+                report.skipped.extend(_rest(group, end) + groups[index + 1 :])
+                return report
+            chunk_size.committed(clock() - start)
+            report.committed.append(chunk)
+            graph.changes.discard(chunk.uuids)
+            offset, retries = end, 0
+    return report
+
+
+def _rest(group: Batch, offset: int) -> List[Batch]:
+    if offset >= len(group.rows):
+        return []
+    return [Batch(group.kind, group.query, group.rows[offset:], group.uuids[offset:])]
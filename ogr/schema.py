@@ -0,0 +1,53 @@
+from __future__ import annotations
+from typing import Dict, Iterable
+
+
+class SchemaError(Exception):
+    """
+    Raised if uuid indexes or constraints are missing or not online after `DataModel.ensure_schema`.
+    """
+
+
+def uuid_schema(
+    labels: Iterable[str], types: Iterable[str], unique: bool = True
+) -> Dict[str, str]:
+    """
+    returns the statements (by index / constraint name) creating a uniqueness constraint
+    (or, if not `unique`, a range index) on `uuid` for every node label and relationship type,
+    named `ogr_uuid_node_<label>` and `ogr_uuid_rel_<type>` (a label and a type may share a name)
+    """
+    statements = {}
+    for label in sorted(set(labels)):
+        name = f"ogr_uuid_node_{label}"
+        if unique:
+            statements[name] = f"""
+                CREATE CONSTRAINT {name} IF NOT EXISTS
+                FOR (n:{label}) REQUIRE n.uuid IS UNIQUE
+                """
+        else:
+            statements[name] = f"""
+                CREATE INDEX {name} IF NOT EXISTS
+                FOR (n:{label}) ON (n.uuid)
+                """
+    for type in sorted(set(types)):
+        name = f"ogr_uuid_rel_{type}"
+        if unique:
+            statements[name] = f"""
+                CREATE CONSTRAINT {name} IF NOT EXISTS
+                FOR ()-[c:{type}]-() REQUIRE c.uuid IS UNIQUE
+                """
+        else:
+            statements[name] = f"""
+                CREATE INDEX {name} IF NOT EXISTS
+                FOR ()-[c:{type}]-() ON (c.uuid)
+                """
+    return statements
+
+
+AWAIT_INDEXES = "CALL db.awaitIndexes($timeout)"
+
+SHOW_INDEXES = """
+    SHOW INDEXES YIELD name, state
+    WHERE name IN $names
+    RETURN name, state
+    """
@@ -0,0 +1,355 @@
+"""
+Binary snapshots of a `Graph`, written by `Graph.save` and read by `Graph.load`.
+
+Layout (all numbers little endian, every array aligned to 8 bytes):
+
+```
+b"OGRSNAP1"
+per node class:       uuids (u32 string ids), dyn_labels (u32 label set ids), one array per property
+per connection type:  uuids (u32 string ids), node_a / node_b (u32 node ids), one array per property
+string table:         offsets (u64, one more than strings), utf-8 blob
+directory:            JSON: classes, types, columns, label sets and the offset of every array
+footer:               directory offset (u64), directory length (u64), b"OGRSNAP1"
+```
+
+Node ids number the nodes of all classes in file order.
+Property columns are stored by kind: `q` (int64), `d` (float64), `b` (bool), `s` (string id) or
+`j` (string id of a JSON encoding, for everything else, e.g. lists and values mixed with `None`).
+String id `0xFFFFFFFF` stands for `None`.
+Values JSON cannot encode (e.g. neo4j temporal or spatial values) cannot be saved.
+
+Loading maps the file (or reads it) and resolves classes and types through the model's registered classes.
+In a compact graph, the property arrays are read straight from the mapped file on access.
+"""
+
+from __future__ import annotations
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid
+from array import array
+from typing import Any, BinaryIO, Callable, Dict, List, Sequence
+from ogr.node import GenericNode, intern_labels
+from ogr.table import NodeTable
+from ogr.template import template_of
+
+MAGIC = b"OGRSNAP1"
+VERSION = 1
+NONE = 0xFFFFFFFF
+_FOOTER = struct.Struct("<QQ8s")
+_TYPECODES = {"q": "q", "d": "d", "b": "b", "s": "I", "j": "I", "id": "I"}
+
+assert array("I").itemsize == 4
+
+
+def write_snapshot(graph, path: str):
+    """
+    writes the nodes (objects and table rows) and connections of `graph` to `path`.
+    The current state is written, the pending `changes` are not: a loaded snapshot counts as persisted.
+    The snapshot is written to a temporary file first and moved to `path` once complete,
+    so a failed save leaves an existing file at `path` as it was.
+    Raises `ValueError` if a property holds values that cannot be stored.
+    """
+    # next to `path`, as `os.replace` only moves files atomically within a file system
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temporary, "xb") as f:
+            _Writer(f).write(graph)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def read_snapshot(graph, path: str, compact: bool = True, use_mmap: bool = True):
+    """
+    adds the nodes and connections of the snapshot at `path` to `graph`.
+    With `compact`, nodes are kept in node tables (see `Graph`) reading from the snapshot lazily;
+    otherwise they are materialised as node objects.
+    """
+    with open(path, "rb") as f:
+        if use_mmap:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+    _Reader(graph.model, memoryview(buffer)).read(graph, compact)
+
+
+class _Writer:
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.strings: Dict[str, int] = {}
+        self.label_sets: Dict[frozenset, int] = {}
+
+    def write(self, graph):
+        self.f.write(MAGIC)
+        groups: Dict[type, list] = {}
+        for node in graph.nodes.values():
+            groups.setdefault(type(node), []).append(node)
+        for table in graph.tables.values():
+            groups.setdefault(table.cls, []).extend(table)
+
+        node_ids: Dict[str, int] = {}
+        node_blocks = []
+        for cls, nodes in groups.items():
+            for node in nodes:
+                node_ids[node.uuid] = len(node_ids)
+            node_blocks.append(
+                {
+                    "labels": [self.string(x) for x in sorted(cls.labels)],
+                    "count": len(nodes),
+                    "uuids": self.array("id", [self.string(x.uuid) for x in nodes]),
+                    "dyn_labels": self.array(
+                        "id", [self.label_set(x.dyn_labels) for x in nodes]
+                    ),
+                    "columns": self.columns(cls, nodes),
+                }
+            )
+
+        groups = {}
+        for connection in graph.connections.values():
+            groups.setdefault(type(connection), []).append(connection)
+        connection_blocks = []
+        for cls, connections in groups.items():
+            try:
+                node_a = [node_ids[x.node_a.uuid] for x in connections]
+                node_b = [node_ids[x.node_b.uuid] for x in connections]
+            except KeyError as e:
+                raise ValueError(f"connection to node {e} which is not in the graph")
+            connection_blocks.append(
+                {
+                    "type": self.string(cls.type),
+                    "count": len(connections),
+                    "uuids": self.array(
+                        "id", [self.string(x.uuid) for x in connections]
+                    ),
+                    "node_a": self.array("id", node_a),
+                    "node_b": self.array("id", node_b),
+                    "columns": self.columns(cls, connections),
+                }
+            )
+
+        label_sets = [
+            [self.string(x) for x in sorted(labels)] for labels in self.label_sets
+        ]
+        strings = [x.encode() for x in self.strings]
+        offsets = [0]
+        for x in strings:
+            offsets.append(offsets[-1] + len(x))
+        directory = {
+            "version": VERSION,
+            "strings": {
+                "count": len(strings),
+                "offsets": self.array("offsets", offsets),
+                "blob": self.bytes(b"".join(strings)),
+            },
+            "label_sets": label_sets,
+            "nodes": node_blocks,
+            "connections": connection_blocks,
+        }
+        encoded = json.dumps(directory).encode()
+        offset = self.f.tell()
+        self.f.write(encoded)
+        self.f.write(_FOOTER.pack(offset, len(encoded), MAGIC))
+
+    def columns(self, cls: type, objects: list) -> List[dict]:
+        columns = []
+        for name in template_of(cls).property_names:
+            values = [getattr(x, name) for x in objects]
+            kind = _kind(values)
+            if kind == "s":
+                values = [NONE if x is None else self.string(x) for x in values]
+            elif kind == "j":
+                try:
+                    values = [self.string(json.dumps(x)) for x in values]
+                except (TypeError, ValueError) as e:
+                    raise ValueError(
+                        f"cannot store {cls.__name__}.{name} in a snapshot: {e}"
+                    ) from None
+            columns.append(
+                {"name": name, "kind": kind, "offset": self.array(kind, values)}
+            )
+        return columns
+
+    def string(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def label_set(self, labels) -> int:
+        labels = frozenset(labels)
+        index = self.label_sets.get(labels)
+        if index is None:
+            index = self.label_sets[labels] = len(self.label_sets)
+        return index
+
+    def array(self, kind: str, values: Sequence) -> int:
+        data = array("Q" if kind == "offsets" else _TYPECODES[kind], values)
+        if sys.byteorder != "little":
+            data.byteswap()
+        return self.bytes(data.tobytes())
+
+    def bytes(self, data: bytes) -> int:
+        self.f.write(b"\0" * (-self.f.tell() % 8))
+        offset = self.f.tell()
+        self.f.write(data)
+        return offset
+
+
+class _Reader:
+    def __init__(self, model, data: memoryview):
+        self.model = model
+        self.data = data
+        if len(data) < len(MAGIC) + _FOOTER.size or data[: len(MAGIC)] != MAGIC:
+            raise ValueError("not an ogr graph snapshot")
+        offset, length, magic = _FOOTER.unpack(data[-_FOOTER.size :])
+        if magic != MAGIC:
+            raise ValueError("truncated ogr graph snapshot")
+        self.directory = json.loads(bytes(data[offset : offset + length]))
+        if self.directory["version"] != VERSION:
+            raise ValueError(
+                f"unsupported snapshot version {self.directory['version']}"
+            )
+        strings = self.directory["strings"]
+        self.strings = _StringTable(
+            self.array("Q", strings["offsets"], strings["count"] + 1),
+            data[strings["blob"] :],
+        )
+        self.label_sets = [
+            intern_labels(self.strings[x] for x in labels)
+            for labels in self.directory["label_sets"]
+        ]
+
+    def read(self, graph, compact: bool):
+        nodes: List[Any] = []  # by node id
+        for block in self.directory["nodes"]:
+            labels = frozenset(self.strings[x] for x in block["labels"])
+            cls = GenericNode if not labels else self.model.label_nodes_lut.get(labels)
+            if cls is None:
+                raise ValueError(
+                    f"no node class registered with labels {sorted(labels)}"
+                )
+            table = self.table(cls, block)
+            if compact:
+                graph.tables[cls] = table
+                nodes.extend(table)
+            else:
+                for row in range(block["count"]):
+                    node = table.materialize(row)
+                    graph.add_node(node)
+                    nodes.append(node)
+
+        for block in self.directory["connections"]:
+            type_name = self.strings[block["type"]]
+            cls = self.model.type_connections_lut.get(type_name)
+            if cls is None:
+                raise ValueError(f"no connection class registered for type {type_name}")
+            count = block["count"]
+            uuids = self.array("I", block["uuids"], count)
+            node_a = self.array("I", block["node_a"], count)
+            node_b = self.array("I", block["node_b"], count)
+            columns = self.columns(cls, block)
+            template = template_of(cls)
+            for row in range(count):
+                connection = cls(
+                    uuid=self.strings[uuids[row]],
+                    node_a=nodes[node_a[row]],
+                    node_b=nodes[node_b[row]],
+                    **{name: column[row] for name, column in columns.items()},
+                )
+                template.snapshot(connection)
+                graph.add_connection(connection)
+
+    def table(self, cls: type, block: dict) -> NodeTable:
+        count = block["count"]
+        table = NodeTable(cls)
+        table.uuids = [self.strings[x] for x in self.array("I", block["uuids"], count)]
+        label_sets = self.label_sets
+        table.dyn_labels = [
+            label_sets[x] for x in self.array("I", block["dyn_labels"], count)
+        ]
+        table.columns = self.columns(cls, block)
+        table.rows = dict(zip(table.uuids, range(count)))
+        return table
+
+    def columns(self, cls: type, block: dict) -> Dict[str, Sequence]:
+        """
+        the property columns of a block by the property names of `cls`;
+        properties missing in the snapshot are `None`
+        """
+        count = block["count"]
+        stored = {}
+        for column in block["columns"]:
+            kind = column["kind"]
+            values = self.array(_TYPECODES[kind], column["offset"], count)
+            if kind == "b":
+                values = _Decoded(values, bool)
+            elif kind == "s":
+                values = _Decoded(values, self.strings.get)
+            elif kind == "j":
+                values = _Decoded(values, self.json)
+            stored[column["name"]] = values
+        return {
+            name: stored[name] if name in stored else [None] * count
+            for name in template_of(cls).property_names
+        }
+
+    def json(self, index: int) -> Any:
+        return json.loads(self.strings[index])
+
+    def array(self, typecode: str, offset: int, count: int) -> Sequence:
+        size = array(typecode).itemsize * count
+        view = self.data[offset : offset + size]
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+        values = array(typecode, view)
+        values.byteswap()
+        return values
+
+
+class _StringTable:
+    """
+    strings decoded from the snapshot on access
+    """
+
+    def __init__(self, offsets: Sequence[int], blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __getitem__(self, index: int) -> str:
+        return str(self.blob[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+    def get(self, index: int):
+        return None if index == NONE else self[index]
+
+
+class _Decoded:
+    """
+    a column whose stored values are converted on access
+    """
+
+    def __init__(self, values: Sequence, decode: Callable):
+        self.values = values
+        self.decode = decode
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, row: int):
+        return self.decode(self.values[row])
+
+
+def _kind(values: list) -> str:
+    types = set(map(type, values))
+    if types <= {int} and all(-(2**63) <= x < 2**63 for x in values):
+        return "q"
+    if types <= {float}:
+        return "d"
+    if types <= {bool}:
+        return "b"
+    if types <= {str, type(None)}:
+        return "s"
+    return "j"
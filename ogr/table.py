@@ -0,0 +1,123 @@
+from __future__ import annotations
+from typing import Dict, FrozenSet, Iterator, List, Optional
+from ogr.node import MetaNode, Node, intern_labels
+from ogr.template import template_of
+
+
+class NodeTable:
+    """
+    Columnar storage of the persisted nodes of one class, as kept by a compact `Graph`:
+    one list per property plus the uuids and (interned) dynamic labels, all indexed by row.
+    Rows are handed out as `NodeView`s, which hold nothing but the table and the row index.
+    """
+
+    def __init__(self, cls: MetaNode):
+        self.cls = cls
+        self.property_names = template_of(cls).property_names
+        self.uuids: List[str] = []
+        self.dyn_labels: List[FrozenSet[str]] = []
+        self.columns: Dict[str, list] = {name: [] for name in self.property_names}
+        self.rows: Dict[str, int] = {}  # uuid: row
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, uuid: str) -> bool:
+        return uuid in self.rows
+
+    def __iter__(self) -> Iterator[NodeView]:
+        for row in self.rows.values():
+            yield NodeView(self, row)
+
+    def append(
+        self, uuid: str, dyn_labels: FrozenSet[str], properties: dict
+    ) -> NodeView:
+        row = len(self.uuids)
+        self.uuids.append(uuid)
+        self.dyn_labels.append(intern_labels(dyn_labels))
+        for name, column in self.columns.items():
+            column.append(properties.get(name))
+        self.rows[uuid] = row
+        return NodeView(self, row)
+
+    def view(self, uuid: str) -> Optional[NodeView]:
+        row = self.rows.get(uuid)
+        return None if row is None else NodeView(self, row)
+
+    def remove(self, uuid: str):
+        """
+        unlists a row; its values are kept (and not reused) for views still held, e.g. by connections
+        """
+        del self.rows[uuid]
+
+    def materialize(self, row: int) -> Node:
+        """
+        builds a full node object of the table's class from a row, with the row as its persisted state
+        """
+        node = self.cls(
+            uuid=self.uuids[row],
+            dyn_labels=self.dyn_labels[row],
+            **{name: column[row] for name, column in self.columns.items()},
+        )
+        template_of(self.cls).snapshot(node)
+        return node
+
+
+class NodeView:
+    """
+    A read-only view of a row of a `NodeTable`.
+    It exposes the same attributes as a node object (`uuid`, `dyn_labels`, `labels` and all properties),
+    so it can be traversed and connected to like one; `materialize` returns a full node object.
+    Views are created on access, so two views of the same row are equal but not identical.
+    """
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: NodeTable, row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def cls(self) -> MetaNode:
+        return self.table.cls
+
+    @property
+    def labels(self) -> FrozenSet[str]:
+        return self.table.cls.labels
+
+    @property
+    def uuid(self) -> str:
+        return self.table.uuids[self.row]
+
+    @property
+    def dyn_labels(self) -> FrozenSet[str]:
+        return self.table.dyn_labels[self.row]
+
+    def __getattr__(self, name: str):
+        if name in NodeView.__slots__:
+            # slot not set yet, e.g. while copying
+            raise AttributeError(name)
+        column = self.table.columns.get(name)
+        if column is None:
+            raise AttributeError(
+                f"{type(self).__name__} of {self.table.cls.__name__} has no attribute {name!r}"
+            )
+        return column[self.row]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, NodeView):
+            return self.table is other.table and self.row == other.row
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.row))
+
+    def __repr__(self) -> str:
+        properties = ", ".join(
+            f"{name}={column[self.row]!r}"
+            for name, column in self.table.columns.items()
+        )
+        return f"{type(self).__name__}[{self.table.cls.__name__}](uuid={self.uuid!r}, {properties})"
+
+    def materialize(self) -> Node:
+        return self.table.materialize(self.row)
@@ -0,0 +1,406 @@
+from __future__ import annotations
+import attrs
+from operator import attrgetter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Set, Tuple
+from ogr.node import GenericNode, Node, intern_labels
+from ogr.connection import Connection
+
+Statement = Tuple[str, dict]  # query text, parameters
+Diff = Tuple[
+    dict, FrozenSet[str], FrozenSet[str]
+]  # changed properties, added and removed labels
+
+_NODE_FIELDS = frozenset(field.name for field in attrs.fields(Node))
+_CONNECTION_FIELDS = frozenset(field.name for field in attrs.fields(Connection))
+
+
+def _labels(labels: Iterable[str]) -> str:
+    """
+    label expression, e.g. `":A:B"`
+    """
+    return "".join(f":{label}" for label in sorted(labels))
+
+
+def _getter(names: Tuple[str, ...]) -> Callable[[object], tuple]:
+    """
+    returns a function extracting the attributes `names` of an object as a tuple
+    """
+    if not names:
+        return lambda obj: ()
+    if len(names) == 1:
+        get = attrgetter(names[0])
+        return lambda obj: (get(obj),)
+    return attrgetter(*names)
+
+
+class NodeTemplate:
+    """
+    The Cypher statements and the property extractor of a node class, compiled once per class.
+    Statements depending on a node's dynamic labels are compiled once per label combination.
+    Sets only write what changed since the node's snapshot (see `snapshot` and `diff`).
+    """
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.labels: FrozenSet[str] = frozenset(cls.labels)
+        self.property_names: Tuple[str, ...] = tuple(
+            field.name for field in attrs.fields(cls) if field.name not in _NODE_FIELDS
+        )
+        self._get = _getter(self.property_names)
+        self._create: Dict[FrozenSet[str], str] = {}
+        self._unwind_create: Dict[FrozenSet[str], str] = {}
+        # sets are compiled per combination of added and removed dynamic labels
+        self._set: Dict[Tuple[FrozenSet[str], FrozenSet[str]], str] = {}
+        self._unwind_set: Dict[Tuple[FrozenSet[str], FrozenSet[str]], str] = {}
+        self._delete = f"""
+            MATCH (n{_labels(self.labels)} {{uuid: $uuid}})
+            DETACH DELETE n
+            """
+        self._unwind_delete = f"""
+            UNWIND $rows AS row
+            MATCH (n{_labels(self.labels)} {{uuid: row.uuid}})
+            DETACH DELETE n
+            """
+
+    def properties(self, node: Node) -> dict:
+        return dict(zip(self.property_names, self._get(node)))
+
+    def snapshot(self, node: Node):
+        """
+        records the node's current properties and dynamic labels as its persisted state,
+        in a single tuple `(*values, dyn_labels)`
+        """
+        node._persisted = _frozen(self._get(node)) + (intern_labels(node.dyn_labels),)
+
+    def diff(self, node: Node) -> Diff:
+        """
+        the properties and dynamic labels changed since the node's snapshot.
+        Without a snapshot, all properties and labels count as changed.
+        """
+        labels = intern_labels(node.dyn_labels)
+        persisted = node._persisted
+        if persisted is None:
+            return self.properties(node), labels, frozenset()
+        persisted_labels = persisted[-1]
+        props = {
+            name: value
+            for name, value, persisted_value in zip(
+                self.property_names, self._get(node), persisted
+            )
+            if _freeze(value) != persisted_value
+        }
+        return props, labels - persisted_labels, persisted_labels - labels
+
+    def dirty(self, node: Node) -> bool:
+        props, added, removed = self.diff(node)
+        return bool(props or added or removed)
+
+    def create(self, node: Node) -> Statement:
+        query = _cached(self._create, node.dyn_labels, self._compile_create)
+        return query, {"uuid": node.uuid, **self.properties(node)}
+
+    def set(self, node: Node) -> Statement:
+        props, added, removed = self.diff(node)
+        query = _cached_pair(self._set, (added, removed), self._compile_set)
+        return query, {"uuid": node.uuid, "props": props}
+
+    def delete(self, node: Node) -> Statement:
+        return self._delete, {"uuid": node.uuid}
+
+    def unwind_create(self, node: Node) -> Statement:
+        return self.unwind_create_query(node.dyn_labels), {
+            **self.properties(node),
+            "uuid": node.uuid,
+        }
+
+    def unwind_create_query(self, dyn_labels: FrozenSet[str] = frozenset()) -> str:
+        """
+        the statement of `unwind_create` for nodes with `dyn_labels`, taking rows of the uuid and all properties
+        """
+        return _cached(self._unwind_create, dyn_labels, self._compile_unwind_create)
+
+    def unwind_set(self, node: Node) -> Statement:
+        props, added, removed = self.diff(node)
+        query = _cached_pair(
+            self._unwind_set, (added, removed), self._compile_unwind_set
+        )
+        return query, {"uuid": node.uuid, "props": props}
+
+    def unwind_delete(self, node: Node) -> Statement:
+        return self._unwind_delete, {"uuid": node.uuid}
+
+    def _compile_create(self, dyn_labels: FrozenSet[str]) -> str:
+        props = ", ".join(["uuid: $uuid"] + [f"{x}: ${x}" for x in self.property_names])
+        return f"""
+            CREATE (n{_labels(self.labels | dyn_labels)} {{{props}}})
+            """
+
+    def _compile_unwind_create(self, dyn_labels: FrozenSet[str]) -> str:
+        return f"""
+            UNWIND $rows AS row
+            CREATE (n{_labels(self.labels | dyn_labels)})
+            SET n = row
+            """
+
+    def _compile_set(self, added: FrozenSet[str], removed: FrozenSet[str]) -> str:
+        return f"""
+            MATCH (n{_labels(self.labels)} {{uuid: $uuid}})
+            SET n += $props
+            {_set_labels(added, removed)}
+            """
+
+    def _compile_unwind_set(
+        self, added: FrozenSet[str], removed: FrozenSet[str]
+    ) -> str:
+        return f"""
+            UNWIND $rows AS row
+            MATCH (n{_labels(self.labels)} {{uuid: row.uuid}})
+            SET n += row.props
+            {_set_labels(added, removed)}
+            """
+
+
+class GenericNodeTemplate(NodeTemplate):
+    """
+    Template of `GenericNode`, whose properties are not known per class but stored per object.
+    """
+
+    def properties(self, node: GenericNode) -> dict:
+        return dict(node.properties)
+
+    def snapshot(self, node: GenericNode):
+        node._persisted = (
+            {name: _freeze(value) for name, value in node.properties.items()},
+            intern_labels(node.dyn_labels),
+        )
+
+    def diff(self, node: GenericNode) -> Diff:
+        labels = intern_labels(node.dyn_labels)
+        if node._persisted is None:
+            return self.properties(node), labels, frozenset()
+        persisted_props, persisted_labels = node._persisted
+        props = {
+            name: value
+            for name, value in node.properties.items()
+            if name not in persisted_props or _freeze(value) != persisted_props[name]
+        }
+        # properties dropped from the dict are removed by setting them to null
+        props.update(
+            dict.fromkeys(persisted_props.keys() - node.properties.keys(), None)
+        )
+        return props, labels - persisted_labels, persisted_labels - labels
+
+    def create(self, node: GenericNode) -> Statement:
+        query, row = self.unwind_create(node)
+        return query, {"rows": [row]}
+
+
+class ConnectionTemplate:
+    """
+    The Cypher statements and the property extractor of a connection class, compiled once per class.
+    Sets only write the properties changed since the connection's snapshot.
+    """
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.type: str = cls.type
+        self.property_names: Tuple[str, ...] = tuple(
+            field.name
+            for field in attrs.fields(cls)
+            if field.name not in _CONNECTION_FIELDS
+        )
+        self._get = _getter(self.property_names)
+        # creates are compiled per combination of endpoint class labels, which qualify the endpoint matches
+        self._create: Dict[Tuple[FrozenSet[str], FrozenSet[str]], str] = {}
+        self._unwind_create: Dict[Tuple[FrozenSet[str], FrozenSet[str]], str] = {}
+        self._set = f"""
+            MATCH ()-[c:{self.type} {{uuid: $uuid_c}}]->()
+            SET c += $props
+            """
+        self._unwind_set = f"""
+            UNWIND $rows AS row
+            MATCH ()-[c:{self.type} {{uuid: row.uuid}}]->()
+            SET c += row.props
+            """
+        self._delete = f"""
+            MATCH ()-[c:{self.type} {{uuid: $uuid_c}}]->()
+            DELETE c
+            """
+        self._unwind_delete = f"""
+            UNWIND $rows AS row
+            MATCH ()-[c:{self.type} {{uuid: row.uuid}}]->()
+            DELETE c
+            """
+
+    def properties(self, connection: Connection) -> dict:
+        return dict(zip(self.property_names, self._get(connection)))
+
+    def snapshot(self, connection: Connection):
+        """
+        records the connection's current properties as its persisted state
+        """
+        connection._persisted = _frozen(self._get(connection))
+
+    def diff(self, connection: Connection) -> Diff:
+        """
+        the properties changed since the connection's snapshot (connections have no labels)
+        """
+        if connection._persisted is None:
+            return self.properties(connection), frozenset(), frozenset()
+        props = {
+            name: value
+            for name, value, persisted in zip(
+                self.property_names, self._get(connection), connection._persisted
+            )
+            if _freeze(value) != persisted
+        }
+        return props, frozenset(), frozenset()
+
+    def dirty(self, connection: Connection) -> bool:
+        return bool(self.diff(connection)[0])
+
+    def create(self, connection: Connection) -> Statement:
+        query = _cached_pair(self._create, _endpoints(connection), self._compile_create)
+        return query, {
+            "uuid_a": connection.node_a.uuid,
+            "uuid_b": connection.node_b.uuid,
+            "uuid_c": connection.uuid,
+            **self.properties(connection),
+        }
+
+    def set(self, connection: Connection) -> Statement:
+        return self._set, {
+            "uuid_c": connection.uuid,
+            "props": self.diff(connection)[0],
+        }
+
+    def delete(self, connection: Connection) -> Statement:
+        return self._delete, {"uuid_c": connection.uuid}
+
+    def unwind_create(self, connection: Connection) -> Statement:
+        query = self.unwind_create_query(*_endpoints(connection))
+        return query, {
+            "uuid_a": connection.node_a.uuid,
+            "uuid_b": connection.node_b.uuid,
+            "props": {**self.properties(connection), "uuid": connection.uuid},
+        }
+
+    def unwind_create_query(
+        self, labels_a: FrozenSet[str], labels_b: FrozenSet[str]
+    ) -> str:
+        """
+        the statement of `unwind_create` for connections between nodes with class labels `labels_a` and `labels_b`,
+        taking rows of `uuid_a`, `uuid_b` and `props` (the uuid and all properties)
+        """
+        return _cached_pair(
+            self._unwind_create, (labels_a, labels_b), self._compile_unwind_create
+        )
+
+    def unwind_set(self, connection: Connection) -> Statement:
+        return self._unwind_set, {
+            "uuid": connection.uuid,
+            "props": self.diff(connection)[0],
+        }
+
+    def unwind_delete(self, connection: Connection) -> Statement:
+        return self._unwind_delete, {"uuid": connection.uuid}
+
+    def _compile_create(
+        self, labels_a: FrozenSet[str], labels_b: FrozenSet[str]
+    ) -> str:
+        props = ", ".join(
+            ["uuid: $uuid_c"] + [f"{x}: ${x}" for x in self.property_names]
+        )
+        return f"""
+            MATCH (a{_labels(labels_a)} {{uuid: $uuid_a}}), (b{_labels(labels_b)} {{uuid: $uuid_b}})
+            CREATE (a)-[c:{self.type} {{{props}}}]->(b)
+            """
+
+    def _compile_unwind_create(
+        self, labels_a: FrozenSet[str], labels_b: FrozenSet[str]
+    ) -> str:
+        return f"""
+            UNWIND $rows AS row
+            MATCH (a{_labels(labels_a)} {{uuid: row.uuid_a}}), (b{_labels(labels_b)} {{uuid: row.uuid_b}})
+            CREATE (a)-[c:{self.type}]->(b)
+            SET c = row.props
+            """
+
+
+def _set_labels(added: FrozenSet[str], removed: FrozenSet[str]) -> str:
+    clauses = []
+    if added:
+        clauses.append(f"SET n{_labels(added)}")
+    if removed:
+        clauses.append(f"REMOVE n{_labels(removed)}")
+    return " ".join(clauses)
+
+
+def _freeze(value: Any) -> Any:
+    """
+    an immutable copy of a property value (lists become tuples), so snapshots are not changed in place
+    """
+    if isinstance(value, list):
+        return tuple(_freeze(x) for x in value)
+    return value
+
+
+def _frozen(values: tuple) -> tuple:
+    for value in values:
+        if isinstance(value, list):
+            return tuple(map(_freeze, values))
+    return values
+
+
+def _cached(
+    cache: Dict[FrozenSet[str], str],
+    labels: Set[str],
+    build: Callable[[FrozenSet[str]], str],
+) -> str:
+    key = labels if isinstance(labels, frozenset) else frozenset(labels)
+    query = cache.get(key)
+    if query is None:
+        query = cache[key] = build(key)
+    return query
+
+
+def _cached_pair(
+    cache: Dict[Tuple[FrozenSet[str], FrozenSet[str]], str],
+    key: Tuple[FrozenSet[str], FrozenSet[str]],
+    build: Callable[[FrozenSet[str], FrozenSet[str]], str],
+) -> str:
+    query = cache.get(key)
+    if query is None:
+        query = cache[key] = build(*key)
+    return query
+
+
+def _endpoints(connection: Connection) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    return connection.node_a.labels, connection.node_b.labels
+
+
+_templates: Dict[type, NodeTemplate | ConnectionTemplate] = {}
+
+
+def compile_template(cls: type) -> NodeTemplate | ConnectionTemplate:
+    """
+    compiles and caches the template of a node or connection class
+    """
+    if issubclass(cls, GenericNode):
+        template = GenericNodeTemplate(cls)
+    elif issubclass(cls, Node):
+        template = NodeTemplate(cls)
+    else:
+        template = ConnectionTemplate(cls)
+    _templates[cls] = template
+    return template
+
+
+def template_of(cls: type) -> NodeTemplate | ConnectionTemplate:
+    """
+    returns the template of a node or connection class, compiling it if the class has not been registered
+    """
+    template = _templates.get(cls)
+    if template is None:
+        template = compile_template(cls)
+    return template
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import pytest
+from types import SimpleNamespace
+from typing import List, Tuple
+from benchmarks.fake_neo4j import FakeDriver, FakeGraph, FakeNode, FakeResult
+from ogr.graph import Graph
+from ogr.model import DataModel
+
+
+@pytest.fixture
+def db() -> SimpleNamespace:
+    """
+    a model on the fake driver with a `Person` node and a `Knows` connection class;
+    every statement sent is recorded in `statements` as `(query, parameters)`
+    """
+    model = DataModel("bolt://fake", ("neo4j", "neo4j"), driver_factory=FakeDriver)
+
+    @model.register_node
+    class Person:
+        name: str
+        age: int = 0
+
+    @model.register_connection
+    class Knows:
+        since: int = 0
+
+    statements: List[Tuple[str, dict]] = []
+
+    def responder(query: str, parameters: dict) -> FakeResult:
+        statements.append((query, parameters))
+        return FakeResult()
+
+    model.open()
+    model.driver.responder = responder
+    return SimpleNamespace(
+        model=model, Person=Person, Knows=Knows, statements=statements
+    )
+
+
+def persisted_graph(db, *names: str, compact: bool = False) -> Graph:
+    """
+    a graph read from the database holding a `Person` with uuid `p-<name>` per name
+    """
+    return Graph(
+        db.model,
+        raw_graph=FakeGraph(
+            FakeNode(name, ["Person"], {"uuid": f"p-{name}", "name": name, "age": 1})
+            for name in names
+        ),
+        compact=compact,
+    )
+
+
+def people_graph(db, *names: str) -> Graph:
+    """
+    a graph creating a `Person` per name and a `Knows` from each person to the next
+    """
+    graph = Graph(db.model)
+    people = [db.Person(name=name) for name in names]
+    for person in people:
+        graph.create_node(person)
+    for a, b in zip(people, people[1:]):
+        graph.create_connection(db.Knows(node_a=a, node_b=b))
+    return graph
+
+
+def fail_on(db, name: str):
+    """
+    makes statements writing the person `name` fail
+    """
+
+    def responder(query, parameters):
+        db.statements.append((query, parameters))
+        if any(row.get("name") == name for row in parameters.get("rows", ())):
+            raise RuntimeError(f"cannot write {name}")
+        return FakeResult()
+
+    db.model.driver.responder = responder
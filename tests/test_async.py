@@ -0,0 +1,39 @@
+import asyncio
+from benchmarks.fake_neo4j import FakeAsyncDriver, FakeNode, FakeResult
+from ogr.async_model import AsyncDataModel
+from ogr.graph import Graph
+from ogr.instrumentation import Instrumentation, StatementEvent
+
+
+def test_statements_are_instrumented(db):
+    events = []
+    db.model.instrumentation = Instrumentation(events.append)
+    raw = FakeNode("ada", ["Person"], {"uuid": "p-ada", "name": "ada", "age": 1})
+
+    async def main():
+        async with AsyncDataModel(db.model, FakeAsyncDriver) as async_model:
+            async_model.driver.responder = lambda query, parameters: FakeResult(
+                [{"a": raw}]
+            )
+            node = await async_model.get_node_by_uuid("p-ada")
+            graph = Graph(db.model)
+            graph.create_node(db.Person(name="bob"))
+            await async_model.write_graph(graph, batch_size=10)
+            async with await async_model.query("MATCH (a) RETURN a") as result:
+                records = [record async for record in result]
+            return node, records
+
+    node, records = asyncio.run(main())
+    assert node.name == "ada"
+    assert len(records) == 1
+    statements = [x for x in events if isinstance(x, StatementEvent)]
+    assert [x.operation for x in statements] == [
+        "async_get_node_by_uuid",
+        "async_write_graph",
+        "async_query",
+    ]
+    assert all(x.summary is not None and x.error is None for x in statements)
+    assert statements[1].rows == 1
+    metrics = db.model.metrics()
+    assert metrics["statements"]["async_write_graph"]["statements"] == 1
+    assert metrics["flushes"]["async_write_graph"]["flushes"] == 1
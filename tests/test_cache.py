@@ -0,0 +1,53 @@
+from benchmarks.fake_neo4j import FakeNode, FakeResult
+from ogr.cache import ObjectCache
+from ogr.template import template_of
+
+
+def cached_model(db):
+    """
+    `db` with an object cache, answering every node lookup with the person `p-ann`
+    """
+    db.model.object_cache = ObjectCache()
+    raw = FakeNode("ann", ["Person"], {"uuid": "p-ann", "name": "ann", "age": 1})
+
+    def responder(query, parameters):
+        db.statements.append((query, parameters))
+        return FakeResult([{"a": raw}])
+
+    db.model.driver.responder = responder
+    return db.model
+
+
+def test_hits_are_fresh_objects(db):
+    model = cached_model(db)
+    first = model.get_node_by_uuid("p-ann")
+    first.name = "mutated-not-written"
+    second = model.get_node_by_uuid("p-ann")
+    assert len(db.statements) == 1
+    assert second is not first
+    assert second.name == "ann"
+    assert not template_of(db.Person).dirty(second)
+
+
+def test_hits_share_the_session_identity_map(db):
+    model = cached_model(db)
+    model.get_node_by_uuid("p-ann")
+    with model.session():
+        first = model.get_node_by_uuid("p-ann")
+        assert model.get_node_by_uuid("p-ann") is first
+        assert model.get_nodes_by_uuids(["p-ann"]).found["p-ann"] is first
+    assert len(db.statements) == 1
+
+
+def test_hits_respect_cls(db):
+    model = cached_model(db)
+
+    @model.register_node
+    class Robot:
+        serial: str = ""
+
+    model.get_node_by_uuid("p-ann")
+    assert isinstance(model.get_node_by_uuid("p-ann", db.Person), db.Person)
+    assert len(db.statements) == 1
+    model.get_node_by_uuid("p-ann", Robot)
+    assert len(db.statements) == 2
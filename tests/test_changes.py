@@ -0,0 +1,77 @@
+from conftest import persisted_graph
+from ogr.graph import Graph
+
+
+def test_create_then_set_stays_one_create(db):
+    graph = Graph(db.model)
+    person = db.Person(name="ada")
+    graph.create_node(person)
+    person.age = 36
+    graph.set_node(person)
+
+    assert [change.kind for change in graph.changes] == ["create_node"]
+    db.model.write_graph(graph)
+    ((query, parameters),) = db.statements
+    assert "CREATE" in query
+    assert parameters["age"] == 36
+
+
+def test_create_then_delete_is_a_noop(db):
+    graph = Graph(db.model)
+    person = db.Person(name="ada")
+    graph.create_node(person)
+    graph.delete_node(person)
+
+    assert len(graph.changes) == 0
+    db.model.write_graph(graph)
+    assert db.statements == []
+
+
+def test_set_then_delete_becomes_delete(db):
+    graph = persisted_graph(db, "ada")
+    person = graph.nodes["p-ada"]
+    person.age = 2
+    graph.set_node(person)
+    graph.delete_node(person)
+
+    assert [change.kind for change in graph.changes] == ["delete_node"]
+    db.model.write_graph(graph)
+    ((query, parameters),) = db.statements
+    assert "DETACH DELETE" in query
+    assert parameters == {"uuid": "p-ada"}
+
+
+def test_repeated_sets_collapse(db):
+    graph = persisted_graph(db, "ada")
+    person = graph.nodes["p-ada"]
+    for age in (2, 3, 4):
+        person.age = age
+        graph.set_node(person)
+
+    db.model.write_graph(graph)
+    ((_, parameters),) = db.statements
+    assert parameters["props"] == {"age": 4}
+
+
+def test_deleting_a_node_drops_changes_of_its_connections(db):
+    graph = persisted_graph(db, "ada", "bob", "eve")
+    ada, bob, eve = (graph.nodes[f"p-{x}"] for x in ("ada", "bob", "eve"))
+    to_bob = graph.create_connection(db.Knows(node_a=ada, node_b=bob))
+    to_eve = graph.create_connection(db.Knows(node_a=bob, node_b=eve))
+    graph.delete_node(ada)
+
+    assert to_bob.uuid not in graph.changes
+    assert to_eve.uuid in graph.changes
+    assert sorted(change.kind for change in graph.changes) == [
+        "create_connection",
+        "delete_node",
+    ]
+
+
+def test_changes_are_cleared_after_write(db):
+    graph = Graph(db.model)
+    graph.create_node(db.Person(name="ada"))
+    db.model.write_graph(graph, batch_size=10)
+
+    assert len(graph.changes) == 0
+    assert len(db.statements) == 1
@@ -0,0 +1,157 @@
+import pytest
+from benchmarks.fake_neo4j import FakeGraph, FakeNode, FakeRelationship
+from ogr.graph import Graph
+
+np = pytest.importorskip("numpy")
+
+
+def raw_people(n: int):
+    return [
+        FakeNode(str(i), ["Person"], {"uuid": f"p-{i}", "name": f"p{i}", "age": i})
+        for i in range(n)
+    ]
+
+
+def chain(db, n: int, compact: bool = False) -> Graph:
+    """
+    `n` people, each knowing the next
+    """
+    nodes = raw_people(n)
+    knows = [
+        FakeRelationship(f"k{i}", "Knows", a, b, {"uuid": f"k-{i}", "since": i})
+        for i, (a, b) in enumerate(zip(nodes, nodes[1:]))
+    ]
+    return Graph(db.model, raw_graph=FakeGraph(nodes, knows), compact=compact)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_to_columns(db, compact):
+    graph = chain(db, 4, compact=compact)
+    columns = graph.to_columns(db.Person)
+    assert len(columns) == 4
+    assert columns.uuids.tolist() == ["p-0", "p-1", "p-2", "p-3"]
+    assert columns["age"].dtype == np.int64
+    assert columns["age"].tolist() == [0, 1, 2, 3]
+    assert columns["name"].tolist() == ["p0", "p1", "p2", "p3"]
+    assert columns.index == {"p-0": 0, "p-1": 1, "p-2": 2, "p-3": 3}
+
+
+def test_to_columns_of_a_partly_materialised_graph(db):
+    graph = chain(db, 3, compact=True)
+    node = graph.node("p-1").materialize()
+    node.age = 10
+    graph.set_node(node)
+    columns = graph.to_columns(db.Person)
+    # node objects first, then the remaining table rows
+    assert columns.uuids.tolist() == ["p-1", "p-0", "p-2"]
+    assert columns["age"].tolist() == [10, 0, 2]
+
+
+def test_mapped_snapshot_columns_are_not_copied(db, tmp_path):
+    chain(db, 3).save(tmp_path / "graph.ogr")
+    graph = Graph.load(db.model, tmp_path / "graph.ogr")
+    columns = graph.to_columns(db.Person)
+    assert columns["age"].tolist() == [0, 1, 2]
+    # read straight from the mapped file
+    assert not columns["age"].flags.owndata
+    assert not columns["age"].flags.writeable
+    assert columns["name"].tolist() == ["p0", "p1", "p2"]
+
+
+def test_nested_values_have_object_dtype(db):
+    @db.model.register_node
+    class Tagged:
+        tags: list = None
+
+    graph = Graph(db.model)
+    for tags in (["a", "b"], ["c", "d"], None):
+        graph.create_node(Tagged(tags=tags))
+    column = graph.to_columns(Tagged)["tags"]
+    assert column.dtype == object
+    assert column.shape == (3,)
+    assert column.tolist() == [["a", "b"], ["c", "d"], None]
+
+
+def test_edge_index(db):
+    graph = chain(db, 4, compact=True)
+    starts, ends = graph.edge_index(db.Knows)
+    assert starts.dtype == ends.dtype == np.int64
+    assert starts.tolist() == [0, 1, 2]
+    assert ends.tolist() == [1, 2, 3]
+    assert [x.tolist() for x in graph.edge_index("Knows", db.Person, db.Person)] == [
+        [0, 1, 2],
+        [1, 2, 3],
+    ]
+    empty = Graph(db.model).edge_index(db.Knows)
+    assert [x.tolist() for x in empty] == [[], []]
+
+
+def test_edge_index_with_mixed_endpoints(db):
+    @db.model.register_node
+    class Robot:
+        serial: str = ""
+
+    people = raw_people(2)
+    robot = FakeNode("r", ["Robot"], {"uuid": "r-1", "serial": "x"})
+    knows = [
+        FakeRelationship("k0", "Knows", people[0], people[1], {"uuid": "k-0"}),
+        FakeRelationship("k1", "Knows", people[0], robot, {"uuid": "k-1"}),
+    ]
+    graph = Graph(db.model, raw_graph=FakeGraph([*people, robot], knows))
+
+    with pytest.raises(ValueError, match="Person, Robot"):
+        graph.edge_index(db.Knows)
+    starts, ends = graph.edge_index(db.Knows, target=Robot)
+    assert (starts.tolist(), ends.tolist()) == ([0], [0])
+    starts, ends = graph.edge_index(db.Knows, target=db.Person)
+    assert (starts.tolist(), ends.tolist()) == ([0], [1])
+
+
+def test_from_columns_creates_nodes(db):
+    uuids = db.model.from_columns(
+        db.Person,
+        {"name": np.array(["ada", "bob", "eve"]), "age": np.arange(3)},
+        batch_size=2,
+    )
+    assert len(set(uuids)) == 3
+    assert [len(parameters["rows"]) for _, parameters in db.statements] == [2, 1]
+    rows = [row for _, parameters in db.statements for row in parameters["rows"]]
+    assert rows == [
+        {"name": name, "age": age, "uuid": uuid}
+        for name, age, uuid in zip(["ada", "bob", "eve"], [0, 1, 2], uuids)
+    ]
+    # plain Python values, not NumPy scalars
+    assert type(rows[0]["age"]) is int
+    assert db.model.driver.counters["transactions"] == 2
+
+
+def test_from_columns_keeps_given_uuids(db):
+    uuids = db.model.from_columns(db.Person, {"uuid": ["a", "b"], "name": ["x", "y"]})
+    assert uuids == ["a", "b"]
+    ((_, parameters),) = db.statements
+    assert parameters["rows"] == [
+        {"name": "x", "uuid": "a"},
+        {"name": "y", "uuid": "b"},
+    ]
+
+
+def test_from_columns_rejects_bad_columns(db):
+    with pytest.raises(ValueError, match="differ in length"):
+        db.model.from_columns(db.Person, {"name": ["x", "y"], "age": [1]})
+    with pytest.raises(ValueError, match="Person has no properties height"):
+        db.model.from_columns(db.Person, {"height": [1]})
+    assert db.statements == []
+
+
+def test_connections_require_endpoints(db):
+    columns = {"node_a": ["p-ada"], "node_b": ["p-bob"], "since": [2020]}
+    with pytest.raises(ValueError, match="endpoints"):
+        db.model.from_columns(db.Knows, columns)
+    assert db.statements == []
+
+    (uuid,) = db.model.from_columns(db.Knows, columns, endpoints=(db.Person, db.Person))
+    ((query, parameters),) = db.statements
+    assert "(a:Person {uuid: row.uuid_a})" in query
+    assert parameters["rows"] == [
+        {"uuid_a": "p-ada", "uuid_b": "p-bob", "props": {"since": 2020, "uuid": uuid}}
+    ]
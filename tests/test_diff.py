@@ -0,0 +1,70 @@
+from conftest import persisted_graph
+from ogr.graph import Graph
+from ogr.template import template_of
+
+
+def test_unchanged_set_is_a_noop(db):
+    graph = persisted_graph(db, "ada")
+    person = graph.nodes["p-ada"]
+    graph.set_node(person)
+
+    (change,) = graph.changes
+    assert change.is_noop
+    db.model.write_graph(graph)
+    db.model.write_graph(graph, batch_size=10)
+    assert db.statements == []
+
+
+def test_set_writes_only_changed_properties(db):
+    graph = persisted_graph(db, "ada")
+    person = graph.nodes["p-ada"]
+    person.age = 2
+    graph.set_node(person)
+
+    assert template_of(db.Person).diff(person) == ({"age": 2}, frozenset(), frozenset())
+    db.model.write_graph(graph)
+    ((_, parameters),) = db.statements
+    assert parameters == {"uuid": "p-ada", "props": {"age": 2}}
+
+
+def test_reverted_change_is_a_noop(db):
+    graph = persisted_graph(db, "ada")
+    person = graph.nodes["p-ada"]
+    person.age = 2
+    person.age = 1
+    graph.set_node(person)
+
+    assert next(iter(graph.changes)).is_noop
+
+
+def test_label_changes_are_diffed(db):
+    graph = persisted_graph(db, "ada")
+    person = graph.nodes["p-ada"]
+    person.add_label("Admin")
+    graph.set_node(person)
+
+    props, added, removed = template_of(db.Person).diff(person)
+    assert (props, added, removed) == ({}, {"Admin"}, set())
+    db.model.write_graph(graph)
+    ((query, _),) = db.statements
+    assert "SET n:Admin" in query
+
+
+def test_snapshot_is_updated_after_write(db):
+    graph = persisted_graph(db, "ada")
+    person = graph.nodes["p-ada"]
+    person.age = 2
+    graph.set_node(person)
+    db.model.write_graph(graph)
+
+    assert not template_of(db.Person).dirty(person)
+    graph.set_node(person)
+    db.model.write_graph(graph)
+    assert len(db.statements) == 1
+
+
+def test_created_node_is_dirty(db):
+    person = db.Person(name="ada")
+    Graph(db.model).create_node(person)
+
+    assert template_of(db.Person).dirty(person)
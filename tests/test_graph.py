@@ -0,0 +1,119 @@
+import pytest
+from benchmarks.fake_neo4j import FakeGraph, FakeNode, FakeRelationship
+from ogr.graph import Graph
+
+
+def line(db, compact: bool = False) -> Graph:
+    """
+    persisted people a -> b -> c -> d (knows), a self loop on a, and e without connections
+    """
+    nodes = {
+        name: FakeNode(
+            name,
+            ["Person", "Admin"] if name == "a" else ["Person"],
+            {"uuid": name, "name": name, "age": 1},
+        )
+        for name in "abcde"
+    }
+    knows = [
+        FakeRelationship(a + b, "Knows", nodes[a], nodes[b], {"uuid": a + b})
+        for a, b in ("ab", "bc", "cd", "aa")
+    ]
+    return Graph(db.model, raw_graph=FakeGraph(nodes.values(), knows), compact=compact)
+
+
+def uuids(entities) -> list:
+    return [x.uuid for x in entities]
+
+
+def test_edges_of(db):
+    graph = line(db)
+    a = graph.node("a")
+    assert uuids(graph.edges_of(a, "out")) == ["ab", "aa"]
+    assert uuids(graph.edges_of(a, "in")) == ["aa"]
+    # the self loop is yielded once
+    assert uuids(graph.edges_of(a)) == ["ab", "aa"]
+    assert uuids(graph.edges_of(graph.node("c"), types=[db.Knows])) == ["cd", "bc"]
+    assert graph.edges_of(graph.node("c"), types=["Likes"]) == []
+    with pytest.raises(ValueError, match="direction"):
+        graph.edges_of(a, "sideways")
+
+
+def test_neighbors(db):
+    graph = line(db)
+    assert uuids(graph.neighbors(graph.node("a"))) == ["b", "a"]
+    assert uuids(graph.neighbors(graph.node("b"))) == ["c", "a"]
+    assert uuids(graph.neighbors(graph.node("b"), "in")) == ["a"]
+    assert graph.neighbors(graph.node("e")) == []
+
+
+def test_labels_and_types(db):
+    graph = line(db)
+    assert uuids(graph.nodes_with_label("Person")) == list("abcde")
+    assert uuids(graph.nodes_with_label("Admin")) == ["a"]
+    assert uuids(graph.connections_of_type(db.Knows)) == ["ab", "bc", "cd", "aa"]
+    assert graph.connections_of_type("Likes") == []
+
+
+def test_labels_of_a_compact_graph(db):
+    graph = line(db, compact=True)
+    assert uuids(graph.nodes_with_label("Person")) == list("abcde")
+    assert uuids(graph.nodes_with_label("Admin")) == ["a"]
+
+
+def test_bfs(db):
+    graph = line(db)
+    a, c = graph.node("a"), graph.node("c")
+    visits = [(node.uuid, depth) for node, depth in graph.bfs(a)]
+    assert visits == [("a", 0), ("b", 1), ("c", 2), ("d", 3)]
+    assert [x.uuid for x, _ in graph.bfs(a, max_depth=1)] == ["a", "b"]
+    assert [x.uuid for x, _ in graph.bfs(a, max_depth=0)] == ["a"]
+    assert [x.uuid for x, _ in graph.bfs(c, direction="out")] == ["c", "d"]
+    assert [x.uuid for x, _ in graph.bfs(c, direction="in")] == ["c", "b", "a"]
+    assert [x.uuid for x, _ in graph.bfs(c, types=["Likes"])] == ["c"]
+
+
+def test_shortest_path(db):
+    graph = line(db)
+    a, d, e = graph.node("a"), graph.node("d"), graph.node("e")
+    assert uuids(graph.shortest_path(a, d)) == ["ab", "bc", "cd"]
+    assert uuids(graph.shortest_path(d, a)) == ["cd", "bc", "ab"]
+    assert graph.shortest_path(a, d, max_depth=3) is not None
+    assert graph.shortest_path(a, d, max_depth=2) is None
+    assert graph.shortest_path(d, a, direction="out") is None
+    assert graph.shortest_path(a, a) == []
+    assert graph.shortest_path(a, e) is None
+
+
+def test_deleting_a_node_drops_its_connections(db):
+    graph = line(db)
+    graph.delete_node(graph.node("b"))
+    assert sorted(graph.connections) == ["aa", "cd"]
+    assert uuids(graph.edges_of(graph.node("a"))) == ["aa"]
+    assert uuids(graph.edges_of(graph.node("c"))) == ["cd"]
+    assert uuids(graph.connections_of_type(db.Knows)) == ["cd", "aa"]
+    assert "b" not in uuids(graph.nodes_with_label("Person"))
+    assert [x.kind for x in graph.changes] == ["delete_node"]
+
+
+def test_set_connection_reindexes_its_ends(db):
+    graph = line(db)
+    knows = graph.connections["ab"]
+    knows.node_b = graph.node("e")
+    graph.set_connection(knows)
+    assert graph.edges_of(graph.node("b"), "in") == []
+    assert uuids(graph.edges_of(graph.node("e"))) == ["ab"]
+    assert uuids(graph.neighbors(graph.node("a"), "out")) == ["a", "e"]
+    assert len(graph.connections_of_type(db.Knows)) == 4
+
+
+def test_set_node_reindexes_labels(db):
+    graph = line(db)
+    b = graph.node("b")
+    b.add_label("Admin")
+    graph.set_node(b)
+    assert uuids(graph.nodes_with_label("Admin")) == ["a", "b"]
+    a = graph.node("a")
+    a.remove_label("Admin")
+    graph.set_node(a)
+    assert uuids(graph.nodes_with_label("Admin")) == ["b"]
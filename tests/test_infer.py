@@ -0,0 +1,73 @@
+import pytest
+from benchmarks.fake_neo4j import FakeDriver
+from ogr.model import DataModel
+from ogr.node import GenericNode
+
+
+@pytest.fixture
+def model() -> DataModel:
+    model = DataModel("bolt://fake", ("neo4j", "neo4j"), driver_factory=FakeDriver)
+
+    @model.register_node
+    class Person:
+        pass
+
+    @model.register_node(frozenset({"Person", "Employee"}))
+    class Employee:
+        pass
+
+    @model.register_node(frozenset({"Person", "Employee", "Manager"}))
+    class Manager:
+        pass
+
+    @model.register_node(frozenset({"Shared", "First"}))
+    class First:
+        pass
+
+    @model.register_node(frozenset({"Shared", "Second"}))
+    class Second:
+        pass
+
+    return model
+
+
+def inferred(model, *labels):
+    node_type, dyn_labels = model._infer_node_type(frozenset(labels))
+    return node_type.__name__, set(dyn_labels)
+
+
+def test_most_shared_labels_win(model):
+    assert inferred(model, "Person", "Employee", "Manager") == ("Manager", set())
+    assert inferred(model, "Person", "Employee") == ("Employee", set())
+    assert inferred(model, "Person", "Manager") == ("Manager", set())
+    assert inferred(model, "Person", "Employee", "Extra") == ("Employee", {"Extra"})
+
+
+def test_ties_prefer_fewer_missing_labels(model):
+    # Person, Employee and Manager all share one label, only Person misses none
+    assert inferred(model, "Person") == ("Person", set())
+
+
+def test_remaining_ties_prefer_the_first_registered(model):
+    assert inferred(model, "Shared") == ("First", set())
+    assert inferred(model, "Shared", "First", "Second") == ("First", {"Second"})
+    assert inferred(model, "Shared", "Second") == ("Second", set())
+
+
+def test_unknown_labels_fall_back_to_generic_nodes(model):
+    assert model._infer_node_type(frozenset({"Unknown"})) == (
+        GenericNode,
+        frozenset({"Unknown"}),
+    )
+    assert model._infer_node_type(frozenset()) == (GenericNode, frozenset())
+
+
+def test_registering_clears_the_memo(model):
+    assert inferred(model, "Cat") == ("GenericNode", {"Cat"})
+    assert model._infer_node_type(["Cat"]) is model._infer_node_type(frozenset({"Cat"}))
+
+    @model.register_node
+    class Cat:
+        pass
+
+    assert inferred(model, "Cat") == ("Cat", set())
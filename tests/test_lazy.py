@@ -0,0 +1,105 @@
+import pytest
+from benchmarks.fake_neo4j import FakeNode, FakeRelationship, FakeResult
+
+# a - b, a - c, b - d, c - d, d - e
+EDGES = ["ab", "ac", "bd", "cd", "de"]
+
+
+def stored_graph(db):
+    """
+    answers expansions like the database would, from the people and knows connections in `EDGES`;
+    returns the expanded uuids of every query
+    """
+    nodes = {
+        name: FakeNode(name, ["Person"], {"uuid": name, "name": name, "age": 1})
+        for name in "abcde"
+    }
+    knows = [
+        FakeRelationship(a + b, "Knows", nodes[a], nodes[b], {"uuid": a + b})
+        for a, b in EDGES
+    ]
+    expansions = []
+
+    def responder(query, parameters):
+        db.statements.append((query, parameters))
+        expansions.append(parameters["uuids"])
+        records = []
+        for uuid in parameters["uuids"]:
+            connections = [x for x in knows if uuid in x.element_id]
+            for c in connections[: parameters["fan_out"]]:
+                b = c.end_node if c.start_node is nodes[uuid] else c.start_node
+                records.append({"uuid": uuid, "c": c, "a": nodes[uuid], "b": b})
+        return FakeResult(records)
+
+    db.model.driver.responder = responder
+    return expansions
+
+
+def base(db):
+    return db.Person(uuid="a", name="a", age=1)
+
+
+def test_prefetch_fetches_one_query_per_hop(db):
+    expansions = stored_graph(db)
+    graph = db.model.read_subgraph_lazy(
+        base(db), with_conns={db.Knows}, prefetch_depth=2
+    )
+    assert expansions == [["a"], ["b", "c"]]
+    assert sorted(graph.nodes) == list("abcd")
+    assert sorted(graph.connections) == ["ab", "ac", "bd", "cd"]
+    assert graph.expanded == {"a", "b", "c"}
+    query, parameters = db.statements[0]
+    assert "MATCH (a:Person {uuid: uuid})" in query
+    assert "[c:Knows]" in query and "LIMIT" not in query
+    assert parameters["fan_out"] is None
+
+
+def test_traversal_expands_on_demand(db):
+    expansions = stored_graph(db)
+    a = base(db)
+    graph = db.model.read_subgraph_lazy(a, with_conns={db.Knows})
+    assert expansions == [["a"]]
+
+    visits = [(node.uuid, depth) for node, depth in graph.bfs(a)]
+    assert visits == [("a", 0), ("b", 1), ("c", 1), ("d", 2), ("e", 3)]
+    # a is expanded already, every further hop is one query for its whole frontier
+    assert expansions == [["a"], ["b", "c"], ["d"], ["e"]]
+    assert graph.node("a") is a
+    assert len(graph.connections) == len(EDGES)
+
+    # everything is loaded now
+    assert [x.uuid for x in a.neighbors(graph)] == ["b", "c"]
+    assert graph.shortest_path(a, graph.node("e")) is not None
+    assert len(expansions) == 4
+
+
+def test_bfs_expands_only_up_to_max_depth(db):
+    expansions = stored_graph(db)
+    a = base(db)
+    graph = db.model.read_subgraph_lazy(a, with_conns={db.Knows}, prefetch_depth=0)
+    assert expansions == []
+    assert [x.uuid for x, _ in graph.bfs(a, max_depth=1)] == ["a", "b", "c"]
+    assert expansions == [["a"]]
+
+
+def test_fan_out(db):
+    expansions = stored_graph(db)
+    graph = db.model.read_subgraph_lazy(
+        base(db), with_conns={db.Knows}, prefetch_depth=2, fan_out=1
+    )
+    query, parameters = db.statements[0]
+    assert "LIMIT $fan_out" in query and parameters["fan_out"] == 1
+    assert expansions == [["a"], ["b"]]
+    # the one connection fetched for b is the known one to a
+    assert sorted(graph.connections) == ["ab"]
+    assert graph.truncated == {"a", "b"}
+
+
+def test_no_types_no_queries(db):
+    stored_graph(db)
+    a = base(db)
+    graph = db.model.read_subgraph_lazy(a)
+    assert graph.neighbors(a) == []
+    assert db.statements == []
+    with pytest.raises(ValueError, match="fan_out"):
+        db.model.read_subgraph_lazy(a, with_conns={db.Knows}, fan_out=0)
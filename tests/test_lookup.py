@@ -0,0 +1,93 @@
+from benchmarks.fake_neo4j import FakeNode, FakeRelationship, FakeResult
+from ogr.cache import ObjectCache
+
+STORED = ["p-ada", "p-bob", "p-eve", "p-joe", "p-kim"]
+
+
+def stored_people(db):
+    """
+    answers `UNWIND` lookups from the people in `STORED`, in reverse order like an unordered match would
+    """
+    nodes = {
+        x: FakeNode(x, ["Person"], {"uuid": x, "name": x[2:], "age": 0}) for x in STORED
+    }
+    knows = {
+        f"k-{a}": FakeRelationship(
+            f"k-{a}", "Knows", nodes[a], nodes[b], {"uuid": f"k-{a}"}
+        )
+        for a, b in zip(STORED, STORED[1:])
+    }
+
+    def responder(query, parameters):
+        db.statements.append((query, parameters))
+        if "UNWIND" not in query:
+            return FakeResult()
+        key, stored = ("c", knows) if "]-" in query else ("a", nodes)
+        return FakeResult(
+            [{key: stored[x]} for x in reversed(parameters["uuids"]) if x in stored]
+        )
+
+    db.model.driver.responder = responder
+
+
+def test_chunks_share_one_transaction(db):
+    stored_people(db)
+    lookup = db.model.get_nodes_by_uuids(STORED, chunk_size=2)
+    assert list(lookup.found) == STORED
+    assert [parameters["uuids"] for _, parameters in db.statements] == [
+        STORED[:2],
+        STORED[2:4],
+        STORED[4:],
+    ]
+    counters = db.model.driver.counters
+    assert counters["transactions"] == 1 and counters["statements"] == 3
+
+
+def test_found_in_requested_order_and_missing(db):
+    stored_people(db)
+    uuids = ["p-eve", "p-nobody", "p-ada", "p-eve", "p-gone", "p-ada"]
+    lookup = db.model.get_nodes_by_uuids(uuids)
+    ((_, parameters),) = db.statements
+    assert parameters["uuids"] == ["p-eve", "p-nobody", "p-ada", "p-gone"]
+    assert list(lookup.found) == ["p-eve", "p-ada"]
+    assert lookup.found["p-eve"].name == "eve"
+    assert lookup.missing == ["p-nobody", "p-gone"]
+
+
+def test_cached_nodes_are_not_queried(db):
+    stored_people(db)
+    db.model.object_cache = ObjectCache()
+    db.model.get_nodes_by_uuids(["p-bob", "p-joe"])
+    db.statements.clear()
+
+    lookup = db.model.get_nodes_by_uuids(["p-ada", "p-bob", "p-eve", "p-joe"])
+    ((_, parameters),) = db.statements
+    assert parameters["uuids"] == ["p-ada", "p-eve"]
+    assert list(lookup.found) == ["p-ada", "p-bob", "p-eve", "p-joe"]
+
+    db.statements.clear()
+    assert list(db.model.get_nodes_by_uuids(["p-bob"]).found) == ["p-bob"]
+    assert db.statements == []
+    db.model.get_nodes_by_uuids(["p-bob"], use_cache=False)
+    ((_, parameters),) = db.statements
+    assert parameters["uuids"] == ["p-bob"]
+
+
+def test_connections(db):
+    stored_people(db)
+    uuids = ["k-p-eve", "k-p-nobody", "k-p-ada", "k-p-eve", "k-p-bob"]
+    lookup = db.model.get_connections_by_uuids(uuids, chunk_size=2)
+    assert [parameters["uuids"] for _, parameters in db.statements] == [
+        ["k-p-eve", "k-p-nobody"],
+        ["k-p-ada", "k-p-bob"],
+    ]
+    assert db.model.driver.counters["transactions"] == 1
+    assert list(lookup.found) == ["k-p-eve", "k-p-ada", "k-p-bob"]
+    assert isinstance(lookup.found["k-p-ada"], db.Knows)
+    assert lookup.missing == ["k-p-nobody"]
+
+
+def test_nothing_to_look_up(db):
+    assert db.model.get_nodes_by_uuids([]).found == {}
+    assert db.model.get_connections_by_uuids([]).missing == []
+    assert db.statements == []
@@ -0,0 +1,79 @@
+import pytest
+import threading
+from benchmarks.fake_neo4j import FakeResult
+from conftest import fail_on, people_graph
+from ogr.parallel import ParallelFlushError
+
+
+def test_connections_start_after_all_nodes_committed(db):
+    graph = people_graph(db, "ada", "bob", "eve", "joe")
+    db.model.write_graph_parallel(graph, workers=4, batch_size=1)
+
+    log = db.model.driver.log
+    kinds = {
+        transaction: "connection" if "]->" in query else "node"
+        for event, transaction, query in log
+        if event == "run"
+    }
+    node_commits = [
+        i
+        for i, (event, transaction, _) in enumerate(log)
+        if event == "commit" and kinds[transaction] == "node"
+    ]
+    connection_begins = [
+        i
+        for i, (event, transaction, _) in enumerate(log)
+        if event == "begin" and kinds[transaction] == "connection"
+    ]
+    assert len(node_commits) == 4 and len(connection_begins) == 3
+    assert max(node_commits) < min(connection_begins)
+
+
+def test_workers_run_concurrently(db):
+    # every node chunk waits until the other one is running as well
+    barrier = threading.Barrier(2, timeout=5)
+
+    def responder(query, parameters):
+        if "CREATE (n:" in query:
+            barrier.wait()
+        return FakeResult()
+
+    db.model.driver.responder = responder
+    graph = people_graph(db, "ada", "bob")
+    report = db.model.write_graph_parallel(graph, workers=2, batch_size=1)
+    assert report.ok
+    assert db.model.driver.peak_in_flight == 2
+
+
+def test_report_lists_failed_and_skipped_chunks(db):
+    fail_on(db, "bad")
+    graph = people_graph(db, "ada", "bad", "eve")
+    with pytest.raises(ParallelFlushError) as e:
+        db.model.write_graph_parallel(graph, workers=2, batch_size=1)
+
+    report = e.value.report
+    (failure,) = report.failed
+    assert failure.phase == 0
+    assert failure.batch.rows[0]["name"] == "bad"
+    assert isinstance(failure.error, RuntimeError)
+    assert sorted(x.rows[0]["name"] for x in report.committed) == ["ada", "eve"]
+    assert [x.kind for x in report.skipped] == ["create_connection"] * 2
+    assert db.model.driver.counters["rollbacks"] == 1
+    assert {x.kind for x in graph.changes} == {"create_node", "create_connection"}
+    assert len(graph.changes) == 3
+
+
+def test_repeated_flush_writes_only_the_remaining_changes(db):
+    fail_on(db, "bad")
+    graph = people_graph(db, "ada", "bad", "eve")
+    with pytest.raises(ParallelFlushError):
+        db.model.write_graph_parallel(graph, workers=2, batch_size=1)
+
+    fail_on(db, "nobody")
+    db.statements.clear()
+    report = db.model.write_graph_parallel(graph, workers=2, batch_size=1)
+    assert report.ok
+    assert len(graph.changes) == 0
+    nodes = [parameters for query, parameters in db.statements if "CREATE (n:" in query]
+    assert [x["rows"][0]["name"] for x in nodes] == ["bad"]
+    assert len(db.statements) == 3
@@ -0,0 +1,65 @@
+from benchmarks.fake_neo4j import FakeDriver
+from ogr.model import DataModel
+
+
+def new_model(**kwargs) -> DataModel:
+    model = DataModel(
+        "bolt://fake", ("neo4j", "neo4j"), driver_factory=FakeDriver, **kwargs
+    )
+
+    @model.register_node
+    class Person:
+        name: str = ""
+
+    return model
+
+
+def test_calls_share_one_driver():
+    opened = FakeDriver.connections_opened
+    model = new_model(max_connection_pool_size=7)
+    assert model.driver is None
+    for _ in range(3):
+        model.get_node_by_uuid("p-ada")
+
+    assert FakeDriver.connections_opened == opened + 1
+    driver = model.driver
+    assert driver.counters["round_trips"] == 1
+    assert driver.counters["sessions"] == 3
+    assert driver.config["max_connection_pool_size"] == 7
+    model.open()
+    assert model.driver is driver
+    assert driver.counters["round_trips"] == 1
+
+
+def test_nested_calls_share_one_session():
+    model = new_model().open()
+    with model.session() as session:
+        with model.session() as nested:
+            assert nested is session
+        model.get_node_by_uuid("p-ada")
+        model.get_nodes_by_uuids(["p-bob", "p-eve"])
+    assert model.driver.counters["sessions"] == 1
+    assert model.driver.counters["transactions"] == 2
+    model.get_node_by_uuid("p-ada")
+    assert model.driver.counters["sessions"] == 2
+
+
+def test_close_releases_the_driver():
+    opened = FakeDriver.connections_opened
+    model = new_model().open()
+    driver = model.driver
+    model.close()
+    assert driver.closed and model.driver is None
+    model.close()
+
+    model.get_node_by_uuid("p-ada")
+    assert model.driver is not driver
+    assert FakeDriver.connections_opened == opened + 2
+
+
+def test_context_manager_releases_the_driver():
+    with new_model() as model:
+        driver = model.driver
+        model.get_node_by_uuid("p-ada")
+        assert not driver.closed
+    assert driver.closed and model.driver is None
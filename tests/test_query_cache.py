@@ -0,0 +1,62 @@
+from benchmarks.fake_neo4j import FakeGraph, FakeNode, FakeRelationship, FakeResult
+from conftest import persisted_graph
+from ogr.cache import QueryCache
+from ogr.model import _query_names
+
+
+def test_query_names():
+    assert _query_names("MATCH (a:Person)-[r:Knows]->(b:Person) RETURN a, r, b") == (
+        {"Person", "Knows"},
+        {"Person", "Knows"},
+    )
+    assert _query_names("MATCH (a:Person)-[r]->(b:Person) RETURN a")[1] is None
+    assert _query_names("MATCH (a:Person)--(b:Person) RETURN a")[1] is None
+    assert _query_names("MATCH (a)-[:Knows]->(b:Person) RETURN count(a)")[0] is None
+    assert _query_names("MATCH (a:Person {name: $name}) RETURN a") == (
+        {"Person"},
+        {"Person"},
+    )
+    assert _query_names("MATCH (a) RETURN a") == (None, None)
+
+
+def answering(db, result):
+    db.model.query_cache = QueryCache()
+
+    def responder(query, parameters):
+        db.statements.append((query, parameters))
+        return result()
+
+    db.model.driver.responder = responder
+
+
+def test_connection_lookup_depends_on_its_nodes(db):
+    ada = FakeNode("ada", ["Person"], {"uuid": "p-ada", "name": "ada", "age": 1})
+    bob = FakeNode("bob", ["Person"], {"uuid": "p-bob", "name": "bob", "age": 1})
+    knows = FakeRelationship("k", "Knows", ada, bob, {"uuid": "k", "since": 1})
+    answering(db, lambda: FakeResult([{"c": knows, "a": ada, "b": bob}]))
+
+    db.model.get_connection_by_uuid("k")
+    db.model.get_connection_by_uuid("k")
+    assert len(db.statements) == 1
+
+    graph = persisted_graph(db, "bob")
+    graph.delete_node(graph.nodes["p-bob"])
+    db.model.write_graph(graph)
+    db.model.get_connection_by_uuid("k")
+    assert len(db.statements) == 3
+
+
+def test_untyped_pattern_depends_on_all_types(db):
+    answering(db, lambda: FakeResult(graph=FakeGraph()))
+    query = "MATCH (a:Person)-[r]->(b:Person) RETURN a, r, b"
+
+    db.model.read(query)
+    db.model.read(query)
+    assert len(db.statements) == 1
+
+    graph = persisted_graph(db, "ada", "bob")
+    ada, bob = graph.nodes["p-ada"], graph.nodes["p-bob"]
+    graph.create_connection(db.Knows(node_a=ada, node_b=bob))
+    db.model.write_graph(graph)
+    db.model.read(query)
+    assert len(db.statements) == 3
@@ -0,0 +1,89 @@
+import neo4j.graph as n4_graph
+from benchmarks.fake_neo4j import FakeResult
+
+NAMES = ["ada", "bob", "eve", "joe"]
+
+
+def streamed_people(db):
+    """
+    answers every query with the people in `NAMES`, one record per person;
+    returns the names of the records pulled so far and the closed sessions
+    """
+    pulled, closed = [], []
+    graph = n4_graph.Graph()
+
+    def records():
+        for i, name in enumerate(NAMES):
+            pulled.append(name)
+            properties = {"uuid": f"p-{name}", "name": name}
+            yield {"a": n4_graph.Node(graph, name, i, ["Person"], properties)}
+
+    def responder(query, parameters):
+        db.statements.append((query, parameters))
+        return FakeResult(records())
+
+    driver = db.model.driver
+    open_session = driver.session
+
+    def session(**config):
+        session = open_session(**config)
+        session.close = lambda: closed.append(session)
+        return session
+
+    driver.responder = responder
+    driver.session = session
+    return pulled, closed
+
+
+def test_records_resolve_lazily(db):
+    pulled, closed = streamed_people(db)
+    result = db.model.query("MATCH (a:Person) RETURN a", fetch_size=2)
+    assert pulled == []
+    first = next(result)
+    assert isinstance(first["a"], db.Person) and first["a"].name == "ada"
+    assert pulled == ["ada"]
+    assert [x["a"].name for x in result.fetch(2)] == ["bob", "eve"]
+    assert pulled == ["ada", "bob", "eve"]
+    assert not result.closed and closed == []
+
+
+def test_exhaustion_closes_the_session(db):
+    pulled, closed = streamed_people(db)
+    result = db.model.query("MATCH (a:Person) RETURN a")
+    assert [x["a"].name for x in result] == NAMES
+    assert result.closed
+    ((session,),) = [closed]
+    assert session.config["fetch_size"] == 1000
+    assert result.fetch(1) == []
+    assert len(closed) == 1
+
+
+def test_close_discards_the_rest(db):
+    pulled, closed = streamed_people(db)
+    with db.model.query("MATCH (a:Person) RETURN a") as result:
+        assert result.fetch(1)[0]["a"].name == "ada"
+    assert result.closed and len(closed) == 1
+    assert pulled == ["ada"]
+    result.close()
+    assert len(closed) == 1
+
+
+def test_consume_closes_the_session(db):
+    pulled, closed = streamed_people(db)
+    result = db.model.query("MATCH (a:Person) RETURN a")
+    summary = result.consume()
+    assert summary.query == "MATCH (a:Person) RETURN a"
+    assert pulled == NAMES
+    assert result.closed and len(closed) == 1
+
+
+def test_bound_sessions_stay_open(db):
+    pulled, closed = streamed_people(db)
+    with db.model.session(fetch_size=2) as session:
+        assert len(db.model.query("MATCH (a:Person) RETURN a").fetch(1)) == 1
+        result = db.model.query("MATCH (a:Person) RETURN a", fetch_size=100)
+        assert [x["a"].name for x in result] == NAMES
+        assert result.closed and closed == []
+    assert closed == [session]
+    assert session.config["fetch_size"] == 2
+    assert db.model.driver.counters["sessions"] == 1
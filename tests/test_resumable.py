@@ -0,0 +1,59 @@
+import pytest
+from neo4j.exceptions import TransientError
+from conftest import fail_on, people_graph
+from ogr.resumable import ResumableFlushError
+
+
+def flush(db, graph, **kwargs):
+    return db.model.write_graph_resumable(
+        graph, chunk_size=1, max_chunk_size=1, backoff=0, **kwargs
+    )
+
+
+def test_transient_errors_are_retried(db):
+    db.model.driver.faults = [TransientError("leader switch")] * 2
+    graph = people_graph(db, "ada", "bob")
+    report = flush(db, graph)
+
+    counters = db.model.driver.counters
+    assert counters["faults"] == 2
+    assert counters["rollbacks"] == 2
+    assert counters["commits"] == 3
+    assert [x.kind for x in report.committed] == ["create_node"] * 2 + [
+        "create_connection"
+    ]
+    assert len(graph.changes) == 0
+
+
+def test_retries_are_limited(db):
+    db.model.driver.faults = [TransientError("leader switch")] * 3
+    graph = people_graph(db, "ada", "bob")
+    with pytest.raises(ResumableFlushError) as e:
+        flush(db, graph, max_retries=2)
+
+    report = e.value.report
+    assert isinstance(report.failed[0].error, TransientError)
+    assert report.committed == []
+    assert len(report.skipped) == 2
+    assert db.model.driver.counters["transactions"] == 3
+
+
+def test_flushing_again_resumes(db):
+    fail_on(db, "bad")
+    graph = people_graph(db, "ada", "bad", "eve")
+    with pytest.raises(ResumableFlushError) as e:
+        flush(db, graph)
+
+    report = e.value.report
+    assert [x.rows[0]["name"] for x in report.committed] == ["ada"]
+    assert report.failed[0].batch.rows[0]["name"] == "bad"
+    assert len(graph.changes) == 4
+
+    fail_on(db, "nobody")
+    db.statements.clear()
+    db.model.driver.faults = [TransientError("leader switch")]
+    report = flush(db, graph)
+    names = [x.rows[0].get("name") for x in report.committed]
+    assert names == ["bad", "eve", None, None]
+    assert len(db.statements) == 4
+    assert len(graph.changes) == 0
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+from benchmarks.fake_neo4j import FakeNode, FakeResult
+from uuid_extensions import uuid7str
+
+# creation times (unix seconds) of the stored people, one per hour
+HOURS = [1_700_000_000 + 3600 * i for i in range(6)]
+
+
+def stored_people(db):
+    """
+    answers scans like the database would, from people created at `HOURS`, and returns their uuids
+    """
+    uuids = [uuid7str(ns=t * 10**9 + 123) for t in HOURS]
+    raw = [
+        FakeNode(uuid, ["Person"], {"uuid": uuid, "name": f"p{i}", "age": i})
+        for i, uuid in enumerate(uuids)
+    ]
+
+    def responder(query, parameters):
+        db.statements.append((query, parameters))
+        before = parameters.get("before")
+        page = [
+            {"x": x}
+            for x in raw
+            if x.element_id > parameters["after"]
+            and (before is None or x.element_id < before)
+        ]
+        return FakeResult(page[: parameters["page_size"]])
+
+    db.model.driver.responder = responder
+    return uuids
+
+
+def scanned(db, **kwargs):
+    return [node.uuid for node in db.model.scan(db.Person, **kwargs)]
+
+
+def test_scans_all_in_uuid_order(db):
+    uuids = stored_people(db)
+    assert scanned(db) == uuids
+    ((query, parameters),) = db.statements
+    assert "WHERE x.uuid > $after" in query and "ORDER BY x.uuid" in query
+    assert parameters["after"] == ""
+
+
+def test_since_and_until(db):
+    uuids = stored_people(db)
+    assert scanned(db, since=HOURS[2]) == uuids[2:]
+    assert scanned(db, until=HOURS[2]) == uuids[:2]
+    since = datetime.fromtimestamp(HOURS[1] + 1, timezone.utc)
+    assert scanned(db, since=since, until=HOURS[4] + 1) == uuids[2:5]
+
+
+def test_after_resumes(db):
+    uuids = stored_people(db)
+    assert scanned(db, after=uuids[3]) == uuids[4:]
+    # an `after` before `since` is overridden by it
+    assert scanned(db, since=HOURS[4], after=uuids[0]) == uuids[4:]
+
+
+def test_pages_chain(db):
+    uuids = stored_people(db)
+    assert scanned(db, page_size=2) == uuids
+    afters = [parameters["after"] for _, parameters in db.statements]
+    # three full pages, then an empty one ends the scan
+    assert afters == ["", uuids[1], uuids[3], uuids[5]]
+    assert all(parameters["page_size"] == 2 for _, parameters in db.statements)
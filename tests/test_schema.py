@@ -0,0 +1,82 @@
+import re
+import pytest
+from benchmarks.fake_neo4j import FakeResult
+from ogr.model import _connection_by_uuid_query, _node_by_uuid_query
+from ogr.schema import AWAIT_INDEXES, SHOW_INDEXES, SchemaError, uuid_schema
+
+
+def indexes(db, states):
+    """
+    answers `SHOW INDEXES` with `states` (name: state)
+    """
+
+    def responder(query, parameters):
+        db.statements.append((query, parameters))
+        if query == SHOW_INDEXES:
+            return FakeResult(
+                {"name": name, "state": state} for name, state in states.items()
+            )
+        return FakeResult()
+
+    db.model.driver.responder = responder
+
+
+def test_label_and_type_of_the_same_name():
+    statements = uuid_schema(["Owner"], ["Owner"])
+    assert sorted(statements) == ["ogr_uuid_node_Owner", "ogr_uuid_rel_Owner"]
+    assert "FOR (n:Owner) REQUIRE n.uuid IS UNIQUE" in statements["ogr_uuid_node_Owner"]
+    assert "FOR ()-[c:Owner]-() REQUIRE" in statements["ogr_uuid_rel_Owner"]
+    assert (
+        "CREATE INDEX"
+        in uuid_schema(["Owner"], [], unique=False)["ogr_uuid_node_Owner"]
+    )
+
+
+def test_ensure_schema(db):
+    names = ["ogr_uuid_node_Person", "ogr_uuid_rel_Knows"]
+    indexes(db, dict.fromkeys(names, "ONLINE"))
+    assert db.model.ensure_schema(timeout=10) == dict.fromkeys(names, "ONLINE")
+
+    queries = [query for query, _ in db.statements]
+    assert [x.split()[2] for x in queries[:2]] == names
+    assert queries[2:] == [AWAIT_INDEXES, SHOW_INDEXES]
+    assert db.statements[2][1] == {"timeout": 10}
+    assert db.statements[3][1] == {"names": names}
+
+
+@pytest.mark.parametrize(
+    "states, message",
+    [
+        ({"ogr_uuid_node_Person": "ONLINE"}, "ogr_uuid_rel_Knows (missing)"),
+        (
+            {"ogr_uuid_node_Person": "POPULATING", "ogr_uuid_rel_Knows": "ONLINE"},
+            "ogr_uuid_node_Person (POPULATING)",
+        ),
+    ],
+)
+def test_ensure_schema_raises_unless_online(db, states, message):
+    indexes(db, states)
+    with pytest.raises(SchemaError, match=re.escape(message)):
+        db.model.ensure_schema()
+
+
+def test_lookups_are_unions_of_label_seeks():
+    query = _node_by_uuid_query([frozenset({"A", "B"}), frozenset({"B", "C"})], False)
+    parts = [" ".join(x.split()) for x in query.split("UNION")]
+    assert parts == [
+        f"MATCH (a:{label} {{uuid: $uuid}}) RETURN a" for label in ("A", "B", "C")
+    ]
+    query = _node_by_uuid_query([], True)
+    assert " ".join(query.split()) == (
+        "UNWIND $uuids AS uuid MATCH (a {uuid: uuid}) RETURN a"
+    )
+
+
+def test_connection_lookups_are_unions_of_type_seeks():
+    query = _connection_by_uuid_query(["L", "K", "K"], True)
+    parts = [" ".join(x.split()) for x in query.split("UNION")]
+    assert parts == [
+        f"UNWIND $uuids AS uuid MATCH (a)-[c:{type} {{uuid: uuid}}]->(b) RETURN c, a, b"
+        for type in ("K", "L")
+    ]
+    assert "[c {uuid: $uuid}]" in _connection_by_uuid_query([], False)
@@ -0,0 +1,89 @@
+import pytest
+from neo4j.time import DateTime
+from benchmarks.fake_neo4j import FakeGraph, FakeNode, FakeRelationship
+from ogr.graph import Graph
+from ogr.table import NodeView
+
+
+def _graph(db) -> Graph:
+    ada = FakeNode(
+        "1", ["Person", "Admin"], {"uuid": "p-ada", "name": "ada", "age": 36}
+    )
+    bob = FakeNode("2", ["Person"], {"uuid": "p-bob", "name": "bøb", "age": 0})
+    other = FakeNode("3", ["Other"], {"uuid": "o-1", "tags": [1, "x"], "none": None})
+    knows = FakeRelationship("4", "Knows", ada, bob, {"uuid": "k-1", "since": 1815})
+    return Graph(db.model, raw_graph=FakeGraph([ada, bob, other], [knows]))
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+@pytest.mark.parametrize("compact", [True, False])
+def test_round_trip(db, tmp_path, compact, mmap):
+    graph = _graph(db)
+    graph.save(tmp_path / "graph.ogr")
+    loaded = Graph.load(db.model, tmp_path / "graph.ogr", compact=compact, mmap=mmap)
+
+    for uuid, node in graph.nodes.items():
+        copy = loaded.node(uuid)
+        assert isinstance(copy, NodeView) == compact
+        if isinstance(copy, NodeView):
+            copy = copy.materialize()
+        assert copy == node
+        assert copy.dyn_labels == node.dyn_labels
+    assert loaded.connections.keys() == graph.connections.keys()
+    knows = loaded.connections["k-1"]
+    assert (knows.since, knows.node_a.uuid, knows.node_b.uuid) == (
+        1815,
+        "p-ada",
+        "p-bob",
+    )
+    assert [x.uuid for x in loaded.neighbors(loaded.node("p-ada"))] == ["p-bob"]
+
+
+def test_loaded_graph_records_deltas(db, tmp_path):
+    _graph(db).save(tmp_path / "graph.ogr")
+    loaded = Graph.load(db.model, tmp_path / "graph.ogr")
+    ada = loaded.node("p-ada").materialize()
+    ada.age = 37
+    loaded.set_node(ada)
+    loaded.set_node(loaded.node("p-bob"))
+
+    db.model.write_graph(loaded)
+    ((_, parameters),) = db.statements
+    assert parameters == {"uuid": "p-ada", "props": {"age": 37}}
+
+
+def test_compact_graph_saves_again(db, tmp_path):
+    _graph(db).save(tmp_path / "first.ogr")
+    Graph.load(db.model, tmp_path / "first.ogr").save(tmp_path / "second.ogr")
+    loaded = Graph.load(db.model, tmp_path / "second.ogr", compact=False)
+
+    assert loaded.nodes["p-bob"].name == "bøb"
+    assert loaded.nodes["o-1"].properties == {"tags": [1, "x"], "none": None}
+
+
+def test_unregistered_class_is_rejected(db, tmp_path):
+    _graph(db).save(tmp_path / "graph.ogr")
+    db.model.label_nodes_lut.clear()
+
+    with pytest.raises(ValueError, match="no node class registered"):
+        Graph.load(db.model, tmp_path / "graph.ogr")
+
+
+def test_not_a_snapshot(db, tmp_path):
+    (tmp_path / "graph.ogr").write_bytes(b"nope")
+
+    with pytest.raises(ValueError, match="not an ogr graph snapshot"):
+        Graph.load(db.model, tmp_path / "graph.ogr")
+
+
+def test_unstorable_values_leave_the_file_alone(db, tmp_path):
+    path = tmp_path / "graph.ogr"
+    _graph(db).save(path)
+    saved = path.read_bytes()
+    graph = _graph(db)
+    graph.nodes["p-ada"].age = DateTime(2024, 5, 1, 12, 0, 0)
+
+    with pytest.raises(ValueError, match="Person.age"):
+        graph.save(path)
+    assert path.read_bytes() == saved
+    assert [x.name for x in tmp_path.iterdir()] == ["graph.ogr"]